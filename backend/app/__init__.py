@@ -15,9 +15,21 @@ def create_app(config_class=Config):
 
     # Initialize extensions
     db.init_app(app)
-    migrate.init_app(app, db)
+    # Registers the full-text search tables with db.create_all() and hides them from autogenerate
+    from . import search
+    migrate.init_app(app, db, include_object=search.include_object)
     jwt.init_app(app)
-    CORS(app)
+    from . import response_cache, json_provider, compression
+    response_cache.init_app(app)
+    json_provider.init_app(app)
+    compression.init_app(app)
+    # Pagination cursors travel in headers, which browsers hide unless exposed
+    CORS(app, expose_headers=['X-Next-Cursor', 'X-Prev-Cursor', 'Link', 'ETag'])
+
+    from .pagination import InvalidCursor
+    app.register_error_handler(InvalidCursor, lambda e: ({'error': str(e)}, 400))
+    from .fields import InvalidFields
+    app.register_error_handler(InvalidFields, lambda e: ({'error': str(e)}, 400))
 
     # Register Blueprints
     from .auth import bp as auth_bp
@@ -1,47 +1,17 @@
 import os
+import re
 import json
-import google.generativeai as genai
-import pypdf
-import docx
+import threading
+from . import compaction, extraction
+from .cache import AnalysisCache, make_key
+from .ratelimit import RateLimiter
+from .providers import get_provider
 
-class ResumeAnalyzer:
-    def __init__(self):
-        self.api_key = os.getenv('GEMINI_API_KEY')
-        if not self.api_key:
-            print("Warning: GEMINI_API_KEY not found in environment variables.")
-        else:
-            genai.configure(api_key=self.api_key)
-            self.model = genai.GenerativeModel('gemini-2.5-flash')
-
-    def extract_text(self, file_path):
-        """Extracts text from PDF or DOCX file."""
-        ext = file_path.rsplit('.', 1)[1].lower()
-        text = ""
-        try:
-            if ext == 'pdf':
-                reader = pypdf.PdfReader(file_path)
-                for page in reader.pages:
-                    text += page.extract_text() + "\n"
-            elif ext in ['docx', 'doc']:
-                doc = docx.Document(file_path)
-                for para in doc.paragraphs:
-                    text += para.text + "\n"
-            else:
-                return None
-        except Exception as e:
-            print(f"Error extracting text: {e}")
-            return None
-        return text.strip()
-
-    def analyze_resume(self, resume_text, job_description=None):
-        """
-        Analyzes resume text against a job description (optional) using LLM.
-        Returns a structured JSON object.
-        """
-        if not resume_text:
-            return {"error": "No text provided"}
+# Bump whenever the prompt below (or the resume compaction feeding it) changes so
+# cached results from the old prompt stop matching
+PROMPT_VERSION = '3'
 
-        system_prompt = """
+SYSTEM_PROMPT = """
         You are an expert Senior Technical Recruiter and AI Resume Analyzer (AIRC). 
         Your goal is to provide a highly accurate, critical, and detailed analysis of a resume.
         
@@ -60,34 +30,366 @@ class ResumeAnalyzer:
         }
         """
 
-        user_prompt = f"{system_prompt}\n\nResume Text:\n{resume_text}\n\n"
+# Several resumes are packed into one request for bulk re-scoring, sharing the
+# system prompt and job description instead of resending them per candidate
+BATCH_INSTRUCTIONS = """
+        You will receive several resumes, each introduced by a line "=== Candidate <id> ===".
+        Analyze every candidate independently against the same job description.
+        Output must be a valid JSON array with exactly one object per candidate, each object
+        having the structure above plus a "candidate_id" field holding the candidate's id.
+        """
+
+def parse_json_response(text_response):
+    """Strips Markdown code fences around a model response and parses the JSON inside."""
+    text_response = text_response.strip()
+    if text_response.startswith("```json"):
+        text_response = text_response[7:-3]
+    elif text_response.startswith("```"):
+        text_response = text_response[3:-3]
+    return json.loads(text_response)
+
+# Fields forwarded to streaming clients as soon as the model has finished writing them,
+# in the order the prompt asks for them
+STREAMED_FIELDS = [
+    ('summary', re.compile(r'"summary"\s*:\s*("(?:[^"\\]|\\.)*")')),
+    ('skills', re.compile(r'"skills"\s*:\s*(\[[^\]]*\])')),
+    ('match_score', re.compile(r'"match_score"\s*:\s*(-?\d+(?:\.\d+)?|null)\s*[,}\n]')),
+]
+
+def partial_fields(buffer, seen):
+    """Yields (field, value) for streamed fields that are complete in buffer and not yet in seen."""
+    for field, pattern in STREAMED_FIELDS:
+        if field in seen:
+            continue
+        match = pattern.search(buffer)
+        if not match:
+            continue
+        try:
+            value = json.loads(match.group(1))
+        except ValueError:
+            continue
+        seen.add(field)
+        yield field, value
+
+def with_compaction(result, usage):
+    # A copy, so results held by the cache are never modified
+    return {**result, 'compaction': usage}
+
+def fallback_result(error):
+    # Fallback mock response if API fails
+    return {
+        "summary": f"Analysis failed due to API error: {str(error)}",
+        "skills": [],
+        "experience_level": "Unknown",
+        "match_score": 0,
+        "classification": "Unclassified"
+    }
+
+class ResumeAnalyzer:
+    def __init__(self):
+        # 'llm' always calls the model, 'local' only uses the BM25 scorer,
+        # 'auto' calls the model when the provider is configured and falls back to the scorer
+        self.mode = os.getenv('ANALYZER_MODE', 'auto')
+        self._local_scorer = None
+        # LLM_PROVIDER / LLM_MODEL choose the backend; see providers.get_provider
+        self.provider = get_provider()
+        self.model_name = f"{self.provider.name}/{self.provider.model_name}"
+        self.prompt_version = PROMPT_VERSION
+        # Resume text sent to the model is compacted to this many tokens; 0 disables the limit
+        self.token_budget = int(os.getenv('RESUME_TOKEN_BUDGET') or 2000)
+        priorities = os.getenv('RESUME_SECTION_PRIORITIES')
+        self.section_priorities = [p.strip().lower() for p in priorities.split(',')] if priorities else None
+
+        self.cache = None
+        if os.getenv('ANALYSIS_CACHE_ENABLED', 'True') == 'True':
+            self.cache = AnalysisCache(
+                path=os.getenv('ANALYSIS_CACHE_PATH'),
+                max_entries=int(os.getenv('ANALYSIS_CACHE_MAX_ENTRIES') or 10000),
+                max_age=int(os.getenv('ANALYSIS_CACHE_TTL') or 30 * 24 * 3600)
+            )
+
+        self.limiter = None
+        if os.getenv('LLM_RATE_LIMIT_ENABLED', 'True') == 'True':
+            self.limiter = RateLimiter(
+                name=self.model_name,
+                path=os.getenv('LLM_LIMITER_PATH'),
+                rate=float(os.getenv('LLM_RATE_PER_MINUTE') or 60) / 60,
+                burst=int(os.getenv('LLM_BURST') or 10),
+                max_in_flight=int(os.getenv('LLM_MAX_IN_FLIGHT') or 4),
+                max_retries=int(os.getenv('LLM_MAX_RETRIES') or 3),
+                backoff_base=float(os.getenv('LLM_BACKOFF_BASE') or 1.0),
+                backoff_max=float(os.getenv('LLM_BACKOFF_MAX') or 30.0),
+                failure_threshold=int(os.getenv('LLM_BREAKER_THRESHOLD') or 5),
+                reset_timeout=float(os.getenv('LLM_BREAKER_RESET') or 30.0),
+                acquire_timeout=float(os.getenv('LLM_ACQUIRE_TIMEOUT') or 30.0)
+            )
+
+    @property
+    def local_scorer(self):
+        # NumPy is only imported once local scoring is actually needed
+        if self._local_scorer is None:
+            from .scorer import LocalScorer
+            self._local_scorer = LocalScorer()
+        return self._local_scorer
+
+    @property
+    def use_llm(self):
+        return self.mode == 'llm' or (self.mode == 'auto' and self.provider.available)
+
+    def _llm_failed(self, error, resume_texts, job_description, corpus=()):
+        if self.mode == 'auto':
+            print(f"Falling back to local scoring: {error}")
+            return self.local_scorer.analyze(resume_texts, job_description, corpus)
+        return [fallback_result(error) for _ in resume_texts]
+
+    def _generate(self, prompt):
+        """Sends a prompt to the provider through the rate limiter and returns the response text."""
+        if self.limiter is None:
+            return self.provider.generate(prompt)
+        return self.limiter.call(self.provider.generate, prompt)
+
+    def _generate_stream(self, prompt):
+        """Streaming variant of _generate, yields the response text chunk by chunk."""
+        if self.limiter is None:
+            return self.provider.stream(prompt)
+        return self.limiter.stream(self.provider.stream, prompt)
+
+    def compact(self, resume_text):
+        """
+        Normalizes and trims resume text to the token budget before it goes into a prompt.
+        Returns (compacted_text, usage); usage is reported on the analysis result.
+        """
+        compacted, original_tokens, compacted_tokens = compaction.compact(
+            resume_text, self.token_budget, self.section_priorities)
+        compaction.record(original_tokens, compacted_tokens)
+        return compacted, {
+            'tokens_before': original_tokens,
+            'tokens_after': compacted_tokens,
+            'tokens_saved': original_tokens - compacted_tokens
+        }
+
+    def extract_text(self, file_path):
+        """Extracts text from PDF or DOCX file."""
+        text = extraction.extract_text(file_path)
+        return text.strip() if text is not None else None
+
+    def extract_texts(self, file_paths):
+        """Extracts text from many files in parallel, None for files that failed."""
+        return [text.strip() if text is not None else None for text in extraction.extract_texts(file_paths)]
+
+    def analyze_resume(self, resume_text, job_description=None, corpus=()):
+        """
+        Analyzes resume text against a job description (optional) using LLM.
+        Returns a structured JSON object. corpus holds the texts of the job's other
+        applicants; only local scoring uses them, for IDF.
+        """
+        if not resume_text:
+            return {"error": "No text provided"}
+
+        if not self.use_llm:
+            return self.local_scorer.analyze([resume_text], job_description, corpus)[0]
+
+        compacted, usage = self.compact(resume_text)
+        cache_key = None
+        if self.cache:
+            cache_key = make_key(compacted, job_description, self.model_name, self.prompt_version)
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                return with_compaction(cached, usage)
+
+        try:
+            result = parse_json_response(self._generate(self._build_prompt(compacted, job_description)))
+            # Only successful analyses are cached, fallbacks below must be retried next time
+            if cache_key:
+                self.cache.set(cache_key, result, self.model_name, self.prompt_version)
+            return with_compaction(result, usage)
+        except Exception as e:
+            print(f"LLM Analysis Error: {e}")
+            # The local fallback scores the raw text, like local mode and analyze_batch
+            return with_compaction(self._llm_failed(e, [resume_text], job_description, corpus)[0], usage)
+
+    def _build_prompt(self, resume_text, job_description):
+        user_prompt = f"{SYSTEM_PROMPT}\n\nResume Text:\n{resume_text}\n\n"
         if job_description:
             user_prompt += f"Job Description:\n{job_description}\n\n"
             user_prompt += "Compare the resume against the job description. Be strict with the Match Score."
         else:
             user_prompt += "Analyze this resume for general profile classification and quality."
+        return user_prompt
+
+    def analyze_resume_stream(self, resume_text, job_description=None, corpus=()):
+        """
+        Streaming variant of analyze_resume. Yields (field, value) pairs for summary,
+        skills and match_score as soon as the model has produced them, then
+        ('result', full_result) once the whole response has been parsed.
+        """
+        if not resume_text:
+            yield 'result', {"error": "No text provided"}
+            return
+
+        if not self.use_llm:
+            result = self.local_scorer.analyze([resume_text], job_description, corpus)[0]
+            yield from partial_fields(json.dumps(result), set())
+            yield 'result', result
+            return
 
+        compacted, usage = self.compact(resume_text)
+        cache_key = None
+        if self.cache:
+            cache_key = make_key(compacted, job_description, self.model_name, self.prompt_version)
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                yield from partial_fields(json.dumps(cached), set())
+                yield 'result', with_compaction(cached, usage)
+                return
+
+        seen = set()
+        chunks = []
         try:
-            response = self.model.generate_content(user_prompt)
-            # Clean up response text to ensure it's valid JSON
-            text_response = response.text.strip()
-            if text_response.startswith("```json"):
-                text_response = text_response[7:-3]
-            elif text_response.startswith("```"):
-                text_response = text_response[3:-3]
-            
-            result = json.loads(text_response)
-            return result
+            for chunk in self._generate_stream(self._build_prompt(compacted, job_description)):
+                chunks.append(chunk)
+                yield from partial_fields(''.join(chunks), seen)
+            result = parse_json_response(''.join(chunks))
         except Exception as e:
             print(f"LLM Analysis Error: {e}")
-            # Fallback mock response if API fails
-            return {
-                "summary": f"Analysis failed due to API error: {str(e)}",
-                "skills": [],
-                "experience_level": "Unknown",
-                "match_score": 0,
-                "classification": "Unclassified"
-            }
-
-# Singleton instance
-analyzer = ResumeAnalyzer()
+            result = self._llm_failed(e, [resume_text], job_description, corpus)[0]
+            yield from partial_fields(json.dumps(result), seen)
+            yield 'result', with_compaction(result, usage)
+            return
+
+        if cache_key:
+            self.cache.set(cache_key, result, self.model_name, self.prompt_version)
+        # Anything the incremental matcher missed (unusual formatting) is sent from the parsed result
+        yield from partial_fields(json.dumps(result), seen)
+        yield 'result', with_compaction(result, usage)
+
+    def analyze_batch(self, resumes, job_description, batch_size=None, max_chars=None, on_pack=None):
+        """
+        Scores many resumes against one job description.
+        resumes is a list of (candidate_id, resume_text) pairs; returns {candidate_id: result}.
+        Cached results are reused, the rest are packed several per LLM request. Candidates
+        missing from a packed response are retried one by one with analyze_resume.
+        on_pack, if given, is called before each pack is sent (e.g. to renew a task lease).
+        """
+        batch_size = batch_size or int(os.getenv('ANALYSIS_BATCH_SIZE') or 5)
+        max_chars = max_chars or int(os.getenv('ANALYSIS_BATCH_MAX_CHARS') or 60000)
+
+        results = {}
+        pending = []
+        for candidate_id, resume_text in resumes:
+            if not resume_text:
+                results[candidate_id] = {"error": "No text provided"}
+                continue
+            pending.append((candidate_id, resume_text))
+
+        if not self.use_llm:
+            # One vectorised pass over the whole set, IDF comes from all of this job's resumes
+            local = self.local_scorer.analyze([text for _, text in pending], job_description)
+            results.update(zip([candidate_id for candidate_id, _ in pending], local))
+            return results
+
+        # Packs carry compacted text, retries and local fallbacks start again from the raw text
+        raw_texts = dict(pending)
+        resumes, pending, usages = [], [], {}
+        for candidate_id, text in raw_texts.items():
+            compacted, usages[candidate_id] = self.compact(text)
+            resumes.append((candidate_id, compacted))
+        for candidate_id, resume_text in resumes:
+            cached = None
+            if self.cache:
+                cached = self.cache.get(make_key(resume_text, job_description, self.model_name, self.prompt_version))
+            if cached is not None:
+                results[candidate_id] = cached
+            else:
+                pending.append((candidate_id, resume_text))
+
+        # Greedily fill packs up to batch_size resumes or max_chars of resume text
+        packs, pack, pack_chars = [], [], 0
+        for item in pending:
+            if pack and (len(pack) >= batch_size or pack_chars + len(item[1]) > max_chars):
+                packs.append(pack)
+                pack, pack_chars = [], 0
+            pack.append(item)
+            pack_chars += len(item[1])
+        if pack:
+            packs.append(pack)
+
+        for pack in packs:
+            if on_pack:
+                on_pack()
+            try:
+                packed = self._analyze_pack(pack, job_description)
+            except Exception as e:
+                # The provider itself failed, retrying each candidate would only fail again
+                print(f"LLM Batch Analysis Error: {e}")
+                pack_ids = {candidate_id for candidate_id, _ in pack}
+                others = [text for candidate_id, text in raw_texts.items() if candidate_id not in pack_ids]
+                fallbacks = self._llm_failed(e, [raw_texts[candidate_id] for candidate_id, _ in pack], job_description, others)
+                results.update(zip([candidate_id for candidate_id, _ in pack], fallbacks))
+                continue
+            for candidate_id, resume_text in pack:
+                result = packed.get(candidate_id)
+                if result is None:
+                    result = self.analyze_resume(raw_texts[candidate_id], job_description=job_description)
+                elif self.cache:
+                    self.cache.set(make_key(resume_text, job_description, self.model_name, self.prompt_version),
+                                   result, self.model_name, self.prompt_version)
+                results[candidate_id] = result
+        for candidate_id, usage in usages.items():
+            results[candidate_id] = with_compaction(results[candidate_id], usage)
+        return results
+
+    def _analyze_pack(self, pack, job_description):
+        if len(pack) == 1:
+            # A lone resume goes through the regular single-candidate prompt
+            return {}
+
+        # Candidates are numbered within the pack so the model never sees database ids
+        user_prompt = f"{SYSTEM_PROMPT}\n{BATCH_INSTRUCTIONS}\n"
+        if job_description:
+            user_prompt += f"Job Description:\n{job_description}\n\n"
+        for index, (_, resume_text) in enumerate(pack, start=1):
+            user_prompt += f"=== Candidate {index} ===\n{resume_text}\n\n"
+        user_prompt += "Compare each resume against the job description. Be strict with the Match Score."
+
+        response_text = self._generate(user_prompt)
+        try:
+            parsed = parse_json_response(response_text)
+        except ValueError as e:
+            print(f"LLM Batch Analysis returned invalid JSON: {e}")
+            return {}
+
+        results = {}
+        if isinstance(parsed, list):
+            for item in parsed:
+                if not isinstance(item, dict):
+                    continue
+                try:
+                    index = int(item.pop('candidate_id'))
+                except (KeyError, TypeError, ValueError):
+                    continue
+                if 1 <= index <= len(pack):
+                    results[pack[index - 1][0]] = item
+        return results
+
+_analyzer = None
+_analyzer_lock = threading.Lock()
+
+def get_analyzer():
+    """
+    Returns the shared ResumeAnalyzer, creating it on first use. Building it loads
+    the provider SDK, so app start-up and CLI commands that never analyze a resume
+    do not pay for it.
+    """
+    global _analyzer
+    if _analyzer is None:
+        with _analyzer_lock:
+            if _analyzer is None:
+                _analyzer = ResumeAnalyzer()
+    return _analyzer
+
+def __getattr__(name):
+    # Keeps "from app.ai_engine.analyzer import analyzer" working for existing scripts
+    if name == 'analyzer':
+        return get_analyzer()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
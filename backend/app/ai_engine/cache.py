@@ -0,0 +1,149 @@
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+
+DEFAULT_CACHE_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+    'instance', 'analysis_cache.db'
+)
+
+
+def make_key(resume_text, job_description, model_name, prompt_version):
+    """Content address for one analysis: hash of everything that shapes the LLM output."""
+    h = hashlib.sha256()
+    for part in (resume_text, job_description, model_name, prompt_version):
+        data = (part or '').encode('utf-8')
+        # Length-prefix each part so ("ab", "c") and ("a", "bc") never collide
+        h.update(str(len(data)).encode('ascii') + b':' + data)
+    return h.hexdigest()
+
+
+class AnalysisCache:
+    """
+    Persistent cache of analyze_resume results, stored in a small SQLite file
+    so it is shared by every worker process on the host and survives restarts.
+    Entries expire after max_age seconds and the oldest entries are evicted
+    once max_entries is exceeded.
+    """
+
+    def __init__(self, path=None, max_entries=10000, max_age=30 * 24 * 3600):
+        self.path = path or DEFAULT_CACHE_PATH
+        self.max_entries = max_entries
+        self.max_age = max_age
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+        if self.path != ':memory:':
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        conn = self._conn()
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS analysis_cache ("
+            " key TEXT PRIMARY KEY,"
+            " prompt_version TEXT NOT NULL,"
+            " model_name TEXT NOT NULL,"
+            " result TEXT NOT NULL,"
+            " created_at REAL NOT NULL,"
+            " last_used_at REAL NOT NULL)"
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS ix_analysis_cache_last_used ON analysis_cache (last_used_at)")
+        conn.commit()
+
+    def _conn(self):
+        # sqlite3 connections cannot be shared across threads, keep one per thread
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, key):
+        try:
+            conn = self._conn()
+            row = conn.execute(
+                "SELECT result, created_at FROM analysis_cache WHERE key = ?", (key,)
+            ).fetchone()
+            now = time.time()
+            if row and (not self.max_age or now - row[1] <= self.max_age):
+                conn.execute("UPDATE analysis_cache SET last_used_at = ? WHERE key = ?", (now, key))
+                conn.commit()
+                with self._lock:
+                    self.hits += 1
+                return json.loads(row[0])
+        except sqlite3.Error as e:
+            print(f"Analysis cache read error: {e}")
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def set(self, key, result, model_name, prompt_version):
+        try:
+            now = time.time()
+            conn = self._conn()
+            conn.execute(
+                "INSERT OR REPLACE INTO analysis_cache"
+                " (key, prompt_version, model_name, result, created_at, last_used_at)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                (key, prompt_version, model_name, json.dumps(result), now, now)
+            )
+            conn.commit()
+            self.evict()
+        except sqlite3.Error as e:
+            print(f"Analysis cache write error: {e}")
+
+    def evict(self):
+        """Drops expired entries, then the least recently used ones above max_entries."""
+        conn = self._conn()
+        removed = 0
+        if self.max_age:
+            removed += conn.execute(
+                "DELETE FROM analysis_cache WHERE created_at < ?", (time.time() - self.max_age,)
+            ).rowcount
+        if self.max_entries:
+            removed += conn.execute(
+                "DELETE FROM analysis_cache WHERE key IN ("
+                " SELECT key FROM analysis_cache ORDER BY last_used_at DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,)
+            ).rowcount
+        conn.commit()
+        return removed
+
+    def invalidate(self, prompt_version=None, model_name=None):
+        """
+        Removes cached results. With prompt_version/model_name, only entries that
+        were produced by a *different* prompt or model are dropped, which is what
+        should happen after the prompt is edited. Without arguments, clears everything.
+        """
+        conditions, params = [], []
+        if prompt_version is not None:
+            conditions.append("prompt_version != ?")
+            params.append(prompt_version)
+        if model_name is not None:
+            conditions.append("model_name != ?")
+            params.append(model_name)
+
+        sql = "DELETE FROM analysis_cache"
+        if conditions:
+            sql += " WHERE " + " OR ".join(conditions)
+        conn = self._conn()
+        removed = conn.execute(sql, params).rowcount
+        conn.commit()
+        return removed
+
+    def stats(self):
+        conn = self._conn()
+        entries = conn.execute("SELECT COUNT(*) FROM analysis_cache").fetchone()[0]
+        total = self.hits + self.misses
+        return {
+            'entries': entries,
+            'max_entries': self.max_entries,
+            'max_age': self.max_age,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / total, 4) if total else 0.0
+        }
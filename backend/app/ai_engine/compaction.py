@@ -0,0 +1,154 @@
+import re
+import threading
+import unicodedata
+from collections import Counter
+
+# Rough size of a token for English prose; good enough to budget prompts without a tokenizer
+CHARS_PER_TOKEN = 4
+
+SECTION_HEADINGS = {
+    'summary': ['summary', 'professional summary', 'profile', 'objective', 'career objective', 'about me'],
+    'skills': ['skills', 'technical skills', 'key skills', 'core competencies', 'technologies', 'tech stack', 'tools'],
+    'experience': ['experience', 'work experience', 'professional experience', 'employment', 'employment history',
+                   'work history', 'internships', 'internship'],
+    'projects': ['projects', 'personal projects', 'academic projects', 'key projects'],
+    'education': ['education', 'academic background', 'academics', 'qualifications'],
+    'certifications': ['certifications', 'certificates', 'licenses', 'courses'],
+    'achievements': ['achievements', 'awards', 'honors', 'accomplishments'],
+}
+_HEADING_LOOKUP = {name: section for section, names in SECTION_HEADINGS.items() for name in names}
+
+# Sections earlier in this list keep their text when the budget runs out.
+# 'header' is whatever precedes the first heading (name, contact line, headline).
+DEFAULT_PRIORITIES = ['skills', 'experience', 'header', 'summary', 'projects', 'education',
+                      'certifications', 'achievements', 'other']
+
+BOILERPLATE = [
+    re.compile(r'^page\s*\d+(\s*(of|/)\s*\d+)?$', re.I),
+    re.compile(r'^-?\s*\d{1,3}\s*-?$'),
+    # Running footers such as "Jane Doe | Page 2 of 3"
+    re.compile(r'^.{0,80}\s[|\u2022\u00b7\u2013-]\s*page\s*\d+(\s*(of|/)\s*\d+)?$', re.I),
+    re.compile(r'^references( are)? available (up)?on request\.?$', re.I),
+    re.compile(r'^curriculum vitae$|^resume$|^r[eé]sum[eé]$', re.I),
+]
+
+# Contact details and links, the content of page headers and footers that PDF
+# extraction repeats on every page
+CONTACT_RE = re.compile(
+    r'[\w.+-]+@[\w-]+\.[\w.-]+'
+    r'|https?://|www\.|linkedin\.com|github\.com'
+    r'|\+?\d[\d ().-]{7,}\d',
+    re.I
+)
+
+def estimate_tokens(text):
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+def normalize(text):
+    """Unicode-normalizes, collapses runs of whitespace and drops repeated blank lines."""
+    text = unicodedata.normalize('NFKC', text)
+    lines = [re.sub(r'[ \t\u200b]+', ' ', line).strip() for line in text.splitlines()]
+    result = []
+    for line in lines:
+        if line or (result and result[-1]):
+            result.append(line)
+    return result
+
+def strip_boilerplate(lines):
+    """
+    Drops page numbers, running footers and stock phrases, and keeps only the first
+    copy of short contact / link lines that repeat three or more times - the page
+    header PDF extraction copies onto every page. Other repeated lines (a job title
+    held at several employers, a tech stack listed under several roles) are content
+    and stay.
+    """
+    counts = Counter(line for line in lines if line and len(line) <= 80 and CONTACT_RE.search(line))
+    repeated = {line for line, count in counts.items() if count >= 3}
+    seen = set()
+    result = []
+    for line in lines:
+        if any(pattern.match(line) for pattern in BOILERPLATE):
+            continue
+        if line in repeated:
+            if line in seen:
+                continue
+            seen.add(line)
+        result.append(line)
+    return result
+
+def _heading(line):
+    if not line or len(line) > 40:
+        return None
+    key = re.sub(r'[^a-z ]', '', line.lower()).strip()
+    return _HEADING_LOOKUP.get(key)
+
+def segment(lines):
+    """Splits lines into [section, heading line, body lines] blocks in document order."""
+    blocks = [['header', None, []]]
+    for line in lines:
+        section = _heading(line)
+        if section:
+            blocks.append([section, line, []])
+        else:
+            blocks[-1][2].append(line)
+    return [block for block in blocks if block[1] or any(block[2])]
+
+def compact(text, token_budget, priorities=None):
+    """
+    Normalizes and segments a resume, then fits it into token_budget. Half of the
+    budget is spread evenly so every section keeps its opening lines; the rest is
+    filled in priority order. Sections are cut at line boundaries and reassembled
+    in their original order.
+    Returns (compacted_text, original_tokens, compacted_tokens).
+    """
+    original_tokens = estimate_tokens(text)
+    blocks = segment(strip_boilerplate(normalize(text)))
+    sections = [([heading] if heading else []) + [line for line in body if line]
+                for _, heading, body in blocks]
+
+    if not token_budget:
+        compacted = '\n\n'.join('\n'.join(lines) for lines in sections if lines)
+        return compacted, original_tokens, estimate_tokens(compacted)
+
+    rank = {section: i for i, section in enumerate(priorities or DEFAULT_PRIORITIES)}
+    order = sorted(range(len(blocks)), key=lambda i: (rank.get(blocks[i][0], len(rank)), i))
+    taken = [0] * len(blocks)
+    spent = [0] * len(blocks)
+    remaining = token_budget
+    floor = token_budget // (2 * len(blocks)) if blocks else 0
+
+    for cap in (floor, None):
+        for index in order:
+            lines = sections[index]
+            while taken[index] < len(lines):
+                cost = estimate_tokens(lines[taken[index]]) + 1
+                if cost > remaining or (cap is not None and spent[index] + cost > cap):
+                    break
+                taken[index] += 1
+                spent[index] += cost
+                remaining -= cost
+
+    kept = []
+    for index, lines in enumerate(sections):
+        # A heading on its own carries no information
+        if taken[index] and not (blocks[index][1] and taken[index] == 1):
+            kept.append('\n'.join(lines[:taken[index]]))
+    compacted = '\n\n'.join(kept)
+    return compacted, original_tokens, estimate_tokens(compacted)
+
+_stats_lock = threading.Lock()
+_stats = {'requests': 0, 'tokens_before': 0, 'tokens_after': 0}
+
+def record(original_tokens, compacted_tokens):
+    with _stats_lock:
+        _stats['requests'] += 1
+        _stats['tokens_before'] += original_tokens
+        _stats['tokens_after'] += compacted_tokens
+
+def stats():
+    """Prompt tokens before and after compaction for the resumes compacted in this process."""
+    with _stats_lock:
+        result = dict(_stats)
+    result['tokens_saved'] = result['tokens_before'] - result['tokens_after']
+    result['avg_tokens_saved'] = round(result['tokens_saved'] / result['requests'], 1) if result['requests'] else 0.0
+    return result
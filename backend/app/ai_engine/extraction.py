@@ -0,0 +1,367 @@
+import os
+import time
+import queue
+import atexit
+import threading
+import multiprocessing
+from concurrent.futures import ThreadPoolExecutor
+from .text_store import TextStore, file_sha256
+
+try:
+    import resource
+except ImportError:  # Windows has no resource module, memory caps are skipped there
+    resource = None
+
+SUPPORTED_EXTENSIONS = {'pdf', 'docx', 'doc'}
+
+# Bump whenever extract_file's output changes so stored texts get re-extracted
+EXTRACTOR_VERSION = '2'
+
+class ExtractionError(Exception):
+    pass
+
+def get_budget():
+    """
+    (max_chars, max_pages) read by every extraction. Only the start of a resume
+    reaches the prompt, so parsing stops once either limit is reached; 0 disables a limit.
+    """
+    return (int(os.getenv('EXTRACT_MAX_CHARS') or 30000),
+            int(os.getenv('EXTRACT_MAX_PAGES') or 30))
+
+def iter_pdf_pages(reader):
+    # Page content is only decoded when a page is accessed, so pages past the budget cost nothing
+    for page in reader.pages:
+        yield page.extract_text() or ""
+
+def iter_docx_paragraphs(document):
+    for para in document.paragraphs:
+        yield para.text
+
+def open_units(file_path):
+    """Opens a document and returns a lazy iterator over its pages (PDF) or paragraphs (DOCX)."""
+    # Parsers are imported on first use; pool workers import them at start-up instead
+    ext = file_path.rsplit('.', 1)[1].lower()
+    if ext == 'pdf':
+        import pypdf
+        return iter_pdf_pages(pypdf.PdfReader(file_path))
+    elif ext in ['docx', 'doc']:
+        import docx
+        return iter_docx_paragraphs(docx.Document(file_path))
+    raise ExtractionError(f"Unsupported file type: {ext}")
+
+def extract_file(file_path, max_chars=0, max_pages=0):
+    """
+    Extracts text from a PDF or DOCX file in the current process, stopping early
+    once max_chars characters or max_pages PDF pages have been read.
+    Returns a dict with the text, how many pages/paragraphs were read, whether
+    reading stopped at the budget, and per-stage timings in milliseconds.
+    """
+    started = time.perf_counter()
+    units = open_units(file_path)
+    opened = time.perf_counter()
+    is_pdf = file_path.rsplit('.', 1)[1].lower() == 'pdf'
+
+    parts = []
+    chars = 0
+    truncated = False
+    for part in units:
+        parts.append(part)
+        chars += len(part) + 1
+        if (max_chars and chars >= max_chars) or (is_pdf and max_pages and len(parts) >= max_pages):
+            # Budget reached, the remaining pages/paragraphs are never decoded
+            truncated = True
+            break
+    read = time.perf_counter()
+
+    # Single join at the end instead of growing a string page by page
+    text = "\n".join(parts)
+    if max_chars and len(text) > max_chars:
+        text = text[:max_chars]
+        truncated = True
+    joined = time.perf_counter()
+
+    return {
+        'text': text,
+        'units': len(parts),
+        'truncated': truncated,
+        'timings': {
+            'open_ms': round((opened - started) * 1000, 3),
+            'read_ms': round((read - opened) * 1000, 3),
+            'join_ms': round((joined - read) * 1000, 3),
+        }
+    }
+
+def _peak_rss_mb():
+    if resource is None:
+        return 0
+    # ru_maxrss is reported in kilobytes on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+def _worker_main(conn, max_memory_mb):
+    # Import the parsers before reporting ready, so the worker is warm for its first
+    # document. The address-space cap turns a runaway document into a MemoryError
+    # inside this process instead of swapping the whole host.
+    import pypdf  # noqa: F401
+    import docx  # noqa: F401
+    if resource is not None and max_memory_mb:
+        limit = int(max_memory_mb * 1024 * 1024)
+        try:
+            resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+        except (ValueError, OSError) as e:
+            print(f"Could not set extraction memory limit: {e}")
+
+    conn.send(('ready', None, _peak_rss_mb()))
+    while True:
+        try:
+            request = conn.recv()
+        except EOFError:
+            break
+        if request is None:
+            break
+        try:
+            conn.send(('ok', extract_file(*request), _peak_rss_mb()))
+        except MemoryError:
+            conn.send(('error', 'Document exceeded the extraction memory limit', _peak_rss_mb()))
+        except Exception as e:
+            conn.send(('error', str(e), _peak_rss_mb()))
+
+class _Worker:
+    STARTUP_TIMEOUT = 60
+
+    def __init__(self, ctx, max_memory_mb):
+        self.conn, child_conn = ctx.Pipe()
+        self.process = ctx.Process(target=_worker_main, args=(child_conn, max_memory_mb), daemon=True)
+        self.process.start()
+        child_conn.close()
+        self.ready = False
+
+    def wait_ready(self):
+        # Interpreter start-up and imports must not count against a document's timeout
+        if not self.ready:
+            if not self.conn.poll(self.STARTUP_TIMEOUT):
+                raise ExtractionError("Extraction worker failed to start")
+            self.conn.recv()
+            self.ready = True
+
+    def stop(self):
+        try:
+            self.conn.send(None)
+        except (OSError, ValueError):
+            pass
+        self.process.join(1)
+        self.kill()
+
+    def kill(self):
+        if self.process.is_alive():
+            self.process.kill()
+            self.process.join()
+        self.conn.close()
+
+class ExtractionPool:
+    """
+    A fixed set of warm worker processes that extract text from uploaded files.
+
+    Each document gets a wall-clock timeout; a worker that overruns it is killed
+    and replaced, so a pathological PDF cannot pin a core. Workers also run under
+    an address-space cap and are recycled once their peak RSS passes max_rss_mb.
+    """
+
+    def __init__(self, size, timeout=30, max_memory_mb=1024, max_rss_mb=512):
+        self.size = size
+        self.timeout = timeout
+        self.max_memory_mb = max_memory_mb
+        self.max_rss_mb = max_rss_mb
+        # spawn avoids forking a process that already holds gRPC threads and DB connections
+        self._ctx = multiprocessing.get_context('spawn')
+        self._idle = queue.Queue()
+        self._closed = False
+        for _ in range(size):
+            self._idle.put(_Worker(self._ctx, max_memory_mb))
+
+    def extract(self, file_path, max_chars=0, max_pages=0):
+        """
+        Runs extract_file in a worker process and returns its result dict.
+        Raises ExtractionError on failure or timeout.
+        """
+        if self._closed:
+            raise ExtractionError("Extraction pool is shut down")
+        worker = self._idle.get()
+        timed_out = False
+        try:
+            try:
+                worker.wait_ready()
+            except ExtractionError:
+                # It never started, the next document gets a fresh one
+                worker.kill()
+                worker = _Worker(self._ctx, self.max_memory_mb)
+                raise
+            worker.conn.send((file_path, max_chars, max_pages))
+            if not worker.conn.poll(self.timeout):
+                worker.kill()
+                worker = _Worker(self._ctx, self.max_memory_mb)
+                timed_out = True
+            else:
+                status, payload, peak_rss = worker.conn.recv()
+                if self.max_rss_mb and peak_rss > self.max_rss_mb:
+                    worker.kill()
+                    worker = _Worker(self._ctx, self.max_memory_mb)
+        except (EOFError, OSError) as e:
+            # The worker died mid-document (e.g. killed by the OS), replace it
+            worker.kill()
+            worker = _Worker(self._ctx, self.max_memory_mb)
+            raise ExtractionError(f"Extraction worker crashed: {e}")
+        finally:
+            self._idle.put(worker)
+
+        # Raised outside the try, the worker has already been replaced exactly once
+        if timed_out:
+            raise ExtractionError(f"Extraction timed out after {self.timeout}s")
+        if status != 'ok':
+            raise ExtractionError(payload)
+        return payload
+
+    def extract_many(self, file_paths, max_chars=0, max_pages=0):
+        """Extracts several files in parallel. Returns a list of result dicts, None where extraction failed."""
+        def safe_extract(file_path):
+            try:
+                return self.extract(file_path, max_chars, max_pages)
+            except ExtractionError as e:
+                print(f"Error extracting text from {file_path}: {e}")
+                return None
+
+        with ThreadPoolExecutor(max_workers=self.size) as executor:
+            return list(executor.map(safe_extract, file_paths))
+
+    def shutdown(self):
+        self._closed = True
+        while True:
+            try:
+                self._idle.get_nowait().stop()
+            except queue.Empty:
+                break
+
+_pool = None
+_pool_lock = threading.Lock()
+
+def get_pool():
+    """Returns the shared extraction pool, starting it on first use. None when EXTRACT_WORKERS=0."""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                size = int(os.getenv('EXTRACT_WORKERS') or min(4, os.cpu_count() or 1))
+                if size <= 0:
+                    return None
+                _pool = ExtractionPool(
+                    size,
+                    timeout=float(os.getenv('EXTRACT_TIMEOUT') or 30),
+                    max_memory_mb=int(os.getenv('EXTRACT_MAX_MEMORY_MB') or 1024),
+                    max_rss_mb=int(os.getenv('EXTRACT_MAX_RSS_MB') or 512)
+                )
+                atexit.register(_pool.shutdown)
+    return _pool
+
+_store = None
+
+def get_store():
+    """Returns the extracted-text store, or None when TEXT_STORE_ENABLED is off."""
+    global _store
+    if _store is None and os.getenv('TEXT_STORE_ENABLED', 'True') == 'True':
+        _store = TextStore(os.getenv('TEXT_STORE_DIR'))
+    return _store
+
+def _supported(file_path):
+    return '.' in file_path and file_path.rsplit('.', 1)[1].lower() in SUPPORTED_EXTENSIONS
+
+_stats_lock = threading.Lock()
+_stats = {'documents': 0, 'truncated': 0, 'units': 0, 'open_ms': 0.0, 'read_ms': 0.0, 'join_ms': 0.0}
+
+def _record(result):
+    with _stats_lock:
+        _stats['documents'] += 1
+        _stats['truncated'] += int(result['truncated'])
+        _stats['units'] += result['units']
+        for stage, ms in result['timings'].items():
+            _stats[stage] += ms
+
+def stats():
+    """Totals and per-document averages of the extraction stage timings in this process."""
+    with _stats_lock:
+        result = dict(_stats)
+    documents = result['documents']
+    for stage in ('open_ms', 'read_ms', 'join_ms'):
+        result['avg_' + stage] = round(result[stage] / documents, 3) if documents else 0.0
+        result[stage] = round(result[stage], 3)
+    return result
+
+def _store_version():
+    # Text extracted under a different budget is a different text
+    max_chars, max_pages = get_budget()
+    return f"{EXTRACTOR_VERSION}-{max_chars}-{max_pages}"
+
+def _lookup(file_path):
+    """Returns (sha256, stored text) for a file; both None when the store is off or unreadable."""
+    store = get_store()
+    if store is None:
+        return None, None
+    try:
+        sha256 = file_sha256(file_path)
+    except OSError as e:
+        print(f"Error hashing {file_path}: {e}")
+        return None, None
+    return sha256, store.get(sha256, _store_version())
+
+def _remember(sha256, result):
+    if result is None:
+        return None
+    _record(result)
+    if sha256:
+        get_store().put(sha256, _store_version(), result['text'])
+    return result['text']
+
+def extract_text(file_path):
+    """
+    Extracts text from a PDF or DOCX file. Text already extracted from a file with
+    the same content is returned from the store; otherwise the file is parsed in
+    the extraction pool, within the EXTRACT_MAX_CHARS/EXTRACT_MAX_PAGES budget.
+    Returns None on failure.
+    """
+    if not _supported(file_path):
+        return None
+    sha256, text = _lookup(file_path)
+    if text is not None:
+        return text
+    try:
+        pool = get_pool()
+        if pool is None:
+            result = extract_file(file_path, *get_budget())
+        else:
+            result = pool.extract(file_path, *get_budget())
+    except Exception as e:
+        print(f"Error extracting text: {e}")
+        return None
+    return _remember(sha256, result)
+
+def extract_texts(file_paths):
+    """Batch variant of extract_text, spreading the files that need parsing over all pool workers."""
+    pool = get_pool()
+    if pool is None:
+        return [extract_text(file_path) for file_path in file_paths]
+
+    results = [None] * len(file_paths)
+    hashes = {}
+    to_extract = []
+    for i, file_path in enumerate(file_paths):
+        if not _supported(file_path):
+            continue
+        sha256, text = _lookup(file_path)
+        if text is not None:
+            results[i] = text
+        else:
+            hashes[i] = sha256
+            to_extract.append(i)
+
+    extracted = pool.extract_many([file_paths[i] for i in to_extract], *get_budget())
+    for i, result in zip(to_extract, extracted):
+        results[i] = _remember(hashes[i], result)
+    return results
@@ -0,0 +1,199 @@
+import re
+import json
+
+# Bump whenever build_digest's output changes; stale digests are rebuilt by `flask jobs rebuild-digests`
+DIGEST_VERSION = 2
+
+# Spellings that should count as the same skill
+SKILL_ALIASES = {
+    'js': 'javascript', 'ts': 'typescript', 'golang': 'go', 'k8s': 'kubernetes',
+    'postgres': 'postgresql', 'psql': 'postgresql', 'mongo': 'mongodb', 'node': 'node.js',
+    'nodejs': 'node.js', 'reactjs': 'react', 'react.js': 'react', 'vuejs': 'vue', 'vue.js': 'vue',
+    'nextjs': 'next.js', 'py': 'python', 'ml': 'machine learning', 'dl': 'deep learning',
+    'gcp': 'google cloud', 'amazon web services': 'aws', 'cicd': 'ci/cd',
+    'tf': 'tensorflow', 'sklearn': 'scikit-learn', 'c sharp': 'c#', 'cpp': 'c++',
+}
+
+# Skills recognised in free text (descriptions and requirements), after alias normalisation
+KNOWN_SKILLS = {
+    'python', 'java', 'javascript', 'typescript', 'go', 'rust', 'c', 'c++', 'c#', 'ruby', 'php',
+    'kotlin', 'swift', 'scala', 'r', 'sql', 'nosql', 'html', 'css', 'bash',
+    'react', 'angular', 'vue', 'next.js', 'node.js', 'express', 'django', 'flask', 'fastapi',
+    'spring', 'rails', 'laravel', '.net', 'graphql', 'rest',
+    'postgresql', 'mysql', 'sqlite', 'mongodb', 'redis', 'elasticsearch', 'kafka', 'rabbitmq',
+    'aws', 'azure', 'google cloud', 'docker', 'kubernetes', 'terraform', 'ansible', 'linux',
+    'git', 'ci/cd', 'jenkins', 'microservices',
+    'machine learning', 'deep learning', 'nlp', 'computer vision', 'tensorflow', 'pytorch',
+    'scikit-learn', 'pandas', 'numpy', 'spark', 'hadoop', 'airflow', 'tableau', 'power bi', 'excel',
+    'figma', 'agile', 'scrum', 'jira',
+}
+
+# Skills that are also everyday words; in free text they only count when written as a name ("Go", "REST")
+# Single-letter names (C, R) are too noisy to find in prose and only come from the skills field.
+AMBIGUOUS_SKILLS = {'go': 'Go', 'rest': 'REST', 'spring': 'Spring', 'express': 'Express',
+                    'excel': 'Excel', 'swift': 'Swift', 'rust': 'Rust'}
+
+SENIORITY_PATTERNS = [
+    ('Lead', re.compile(r'\b(lead|principal|staff|head of|architect|manager)\b', re.I)),
+    ('Senior', re.compile(r'\b(senior|sr\.?)\b', re.I)),
+    ('Junior', re.compile(r'\b(junior|jr\.?|intern(ship)?|entry[- ]level|graduate|fresher|trainee)\b', re.I)),
+    ('Mid', re.compile(r'\b(mid[- ]?level|intermediate)\b', re.I)),
+]
+YEARS_RE = re.compile(r'(\d{1,2})\s*\+?\s*(?:-|to)?\s*(?:\d{1,2})?\s*\+?\s*(?:years|yrs)', re.I)
+
+# A sentence containing one of these switches the following sentences to nice-to-have / back to required
+NICE_RE = re.compile(r'nice[- ]to[- ]have|preferred|bonus|\bplus\b|desirable|good to have|optional', re.I)
+REQUIRED_RE = re.compile(r'require|must|mandatory|qualification|essential|minimum', re.I)
+# Sentence / clause ends; the whitespace after them keeps "node.js" and ".net" whole
+CLAUSE_END_RE = re.compile(r'(?<=[.!?;])\s+')
+
+MAX_SUMMARY_CHARS = 300
+MAX_REQUIREMENT_LINES = 10
+MAX_LINE_CHARS = 160
+
+
+def _skill_pattern(terms):
+    # Skill names may contain + # . so word boundaries are spelled out. Longest first,
+    # so "node.js" wins over "node" where both match.
+    alternation = '|'.join(re.escape(term) for term in sorted(terms, key=lambda term: (-len(term), term)))
+    return re.compile(r'(?<![A-Za-z0-9+#.])(?:' + alternation + r')(?![A-Za-z0-9+#]|\.[A-Za-z0-9])')
+
+# Every term found in one pass over the text: ambiguous ones case-sensitively by
+# their written name, the rest in the lowercased text
+_TERMS = [term for term in sorted(KNOWN_SKILLS | set(SKILL_ALIASES)) if len(term) >= 2]
+_NAMED_TERMS = {AMBIGUOUS_SKILLS[term]: term for term in _TERMS if term in AMBIGUOUS_SKILLS}
+PLAIN_SKILLS_RE = _skill_pattern([term for term in _TERMS if term not in AMBIGUOUS_SKILLS])
+NAMED_SKILLS_RE = _skill_pattern(_NAMED_TERMS)
+
+
+def normalize_skill(skill):
+    skill = re.sub(r'\s+', ' ', skill.strip().strip('.;:-*•').lower())
+    return SKILL_ALIASES.get(skill, skill)
+
+def find_skills(text):
+    """Known skills mentioned in free text, in order of first mention."""
+    text = ' ' + (text or '') + ' '
+    first = {}
+    for match in PLAIN_SKILLS_RE.finditer(text.lower()):
+        first.setdefault(match.group(), match.start())
+    for match in NAMED_SKILLS_RE.finditer(text):
+        first.setdefault(_NAMED_TERMS[match.group()], match.start())
+    found = []
+    for _, skill in sorted((start, normalize_skill(term)) for term, start in first.items()):
+        if skill in KNOWN_SKILLS and skill not in found:
+            found.append(skill)
+    return found
+
+def _split_skills(value):
+    if not value:
+        return []
+    if isinstance(value, (list, tuple)):
+        items = value
+    else:
+        items = re.split(r'[,;\n|]', value)
+    result = []
+    for item in items:
+        skill = normalize_skill(str(item))
+        if skill and skill not in result:
+            result.append(skill)
+    return result
+
+def _lines(text):
+    for line in (text or '').splitlines():
+        line = re.sub(r'\s+', ' ', line).strip(' -*•\t')
+        if line:
+            yield line
+
+def _seniority(job):
+    for text in (job.title, job.experience, job.description):
+        for level, pattern in SENIORITY_PATTERNS:
+            if text and pattern.search(text):
+                return level
+    return None
+
+def _min_years(job):
+    for text in (job.experience, job.requirements, job.description):
+        match = YEARS_RE.search(text or '')
+        if match:
+            return int(match.group(1))
+    return None
+
+def _summary(description):
+    text = re.sub(r'\s+', ' ', description or '').strip()
+    sentences = re.split(r'(?<=[.!?])\s+', text)
+    summary = ''
+    for sentence in sentences:
+        if summary and len(summary) + len(sentence) + 1 > MAX_SUMMARY_CHARS:
+            break
+        summary = f"{summary} {sentence}".strip()
+    return summary[:MAX_SUMMARY_CHARS]
+
+def build_digest(job):
+    """
+    Condenses a job posting into the structured form resumes are scored against:
+    normalised skills split into must-haves and nice-to-haves, seniority, minimum
+    years, the key requirement lines and a short summary of the description.
+    Computed once when the job is saved, so per-applicant prompts stay small.
+    """
+    must_have = _split_skills(job.skills)
+    nice_to_have = []
+    requirements = [line[:MAX_LINE_CHARS] for line in _lines(job.requirements)][:MAX_REQUIREMENT_LINES]
+
+    # Sentences are read in order; one like "Nice to have: Go." moves the skills in it and
+    # after it to nice_to_have until a sentence mentioning requirements switches back.
+    # Split within lines too, as one-paragraph descriptions put both on the same line.
+    for text in (job.requirements, job.description):
+        nice = False
+        for line in _lines(text):
+            for clause in CLAUSE_END_RE.split(line):
+                if NICE_RE.search(clause):
+                    nice = True
+                elif REQUIRED_RE.search(clause):
+                    nice = False
+                for skill in find_skills(clause):
+                    if skill not in must_have and skill not in nice_to_have:
+                        (nice_to_have if nice else must_have).append(skill)
+
+    min_years = _min_years(job)
+    seniority = _seniority(job)
+    if seniority is None and min_years is not None:
+        seniority = 'Junior' if min_years < 2 else 'Mid' if min_years < 5 else 'Senior' if min_years < 8 else 'Lead'
+
+    return {
+        'version': DIGEST_VERSION,
+        'title': job.title,
+        'seniority': seniority,
+        'min_years': min_years,
+        'must_have': must_have,
+        'nice_to_have': nice_to_have,
+        'requirements': requirements,
+        'summary': _summary(job.description),
+        'location': job.location,
+        'job_type': job.job_type,
+    }
+
+def render_digest(digest):
+    """The digest as the compact text block that goes into prompts and the local scorer query."""
+    role = digest.get('title') or 'Unspecified role'
+    details = [d for d in (digest.get('seniority'),
+                           f"{digest['min_years']}+ years" if digest.get('min_years') is not None else None) if d]
+    lines = [f"Role: {role}" + (f" ({', '.join(details)})" if details else '')]
+    if digest.get('must_have'):
+        lines.append(f"Must have: {', '.join(digest['must_have'])}")
+    if digest.get('nice_to_have'):
+        lines.append(f"Nice to have: {', '.join(digest['nice_to_have'])}")
+    if digest.get('requirements'):
+        lines.append("Requirements:")
+        lines.extend(f"- {line}" for line in digest['requirements'])
+    if digest.get('summary'):
+        lines.append(f"Summary: {digest['summary']}")
+    return '\n'.join(lines)
+
+def dumps(digest):
+    return json.dumps(digest, separators=(',', ':'))
+
+def loads(value):
+    try:
+        return json.loads(value) if value else None
+    except ValueError:
+        return None
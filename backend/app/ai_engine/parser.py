@@ -1,31 +1,13 @@
-import os
-import docx2txt
-from pypdf import PdfReader
+from .extraction import extract_text
+
+# Thin wrappers kept for existing callers; both formats go through the single
+# streaming pipeline in extraction.py (pool, text store and page/char budget)
 
 def extract_text_from_pdf(file_path):
-    try:
-        reader = PdfReader(file_path)
-        text = ""
-        for page in reader.pages:
-            text += page.extract_text() + "\n"
-        return text
-    except Exception as e:
-        print(f"Error reading PDF: {e}")
-        return None
+    return extract_text(file_path)
 
 def extract_text_from_docx(file_path):
-    try:
-        text = docx2txt.process(file_path)
-        return text
-    except Exception as e:
-        print(f"Error reading DOCX: {e}")
-        return None
+    return extract_text(file_path)
 
 def parse_resume(file_path):
-    ext = os.path.splitext(file_path)[1].lower()
-    if ext == '.pdf':
-        return extract_text_from_pdf(file_path)
-    elif ext in ['.docx', '.doc']:
-        return extract_text_from_docx(file_path)
-    else:
-        return None
+    return extract_text(file_path)
@@ -0,0 +1,286 @@
+import os
+import re
+import json
+import time
+import random
+import hashlib
+import threading
+
+DEFAULT_MODELS = {
+    'gemini': 'gemini-2.5-flash',
+    'openai': 'gpt-4o-mini',
+    'fake': 'fake-resume-analyzer',
+}
+
+
+class ProviderError(Exception):
+    pass
+
+
+class FakeRateLimitError(ProviderError):
+    """Injected by FakeProvider; looks like a provider 429 to the rate limiter."""
+    code = 429
+
+
+def prompt_hash(prompt):
+    return hashlib.sha256(prompt.encode('utf-8')).hexdigest()
+
+
+class LLMProvider:
+    """
+    Minimal interface the analyzer needs from a model: generate() returns the full
+    response text, stream() yields it in chunks. SDKs are imported when a provider
+    is created, so only the configured one is ever loaded.
+    """
+
+    name = None
+
+    def __init__(self, model_name):
+        self.model_name = model_name
+
+    @property
+    def available(self):
+        """False when the provider cannot be called (e.g. no API key configured)."""
+        return True
+
+    def generate(self, prompt):
+        raise NotImplementedError
+
+    def stream(self, prompt):
+        # Providers without native streaming deliver the whole response as one chunk
+        yield self.generate(prompt)
+
+
+class GeminiProvider(LLMProvider):
+    name = 'gemini'
+
+    def __init__(self, model_name, api_key=None):
+        super().__init__(model_name)
+        self.api_key = api_key or os.getenv('GEMINI_API_KEY')
+        self.model = None
+        if not self.api_key:
+            print("Warning: GEMINI_API_KEY not found in environment variables.")
+        else:
+            import google.generativeai as genai
+            genai.configure(api_key=self.api_key)
+            self.model = genai.GenerativeModel(self.model_name)
+
+    @property
+    def available(self):
+        return self.model is not None
+
+    def _require_model(self):
+        if self.model is None:
+            raise ProviderError("GEMINI_API_KEY is not configured")
+        return self.model
+
+    def generate(self, prompt):
+        return self._require_model().generate_content(prompt).text
+
+    def stream(self, prompt):
+        for chunk in self._require_model().generate_content(prompt, stream=True):
+            yield chunk.text
+
+
+class OpenAIProvider(LLMProvider):
+    name = 'openai'
+
+    def __init__(self, model_name, api_key=None):
+        super().__init__(model_name)
+        self.api_key = api_key or os.getenv('OPENAI_API_KEY')
+        self.client = None
+        if not self.api_key:
+            print("Warning: OPENAI_API_KEY not found in environment variables.")
+        else:
+            from openai import OpenAI
+            self.client = OpenAI(api_key=self.api_key)
+
+    @property
+    def available(self):
+        return self.client is not None
+
+    def _create(self, prompt, stream=False):
+        if self.client is None:
+            raise ProviderError("OPENAI_API_KEY is not configured")
+        return self.client.chat.completions.create(
+            model=self.model_name,
+            messages=[{'role': 'user', 'content': prompt}],
+            stream=stream
+        )
+
+    def generate(self, prompt):
+        return self._create(prompt).choices[0].message.content or ""
+
+    def stream(self, prompt):
+        for chunk in self._create(prompt, stream=True):
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
+
+
+class FakeProvider(LLMProvider):
+    """
+    Offline stand-in for a real model, for load tests and benchmarks.
+
+    Responses are replayed from a JSONL file of {"prompt_hash", "response"} records
+    (as written by RecordingProvider). Prompts without a recording get a synthetic
+    analysis derived from the prompt hash, so the same prompt always produces the
+    same answer. Each call takes latency_ms +/- jitter_ms and fails with a
+    429-style error at error_rate. Streams spend first_chunk_share of the latency
+    before the first chunk and spread the rest evenly over the remaining chunks.
+    """
+
+    name = 'fake'
+
+    def __init__(self, model_name, recordings_path=None, latency_ms=0, jitter_ms=0, error_rate=0.0,
+                 chunk_size=40, first_chunk_share=0.5, seed=None):
+        super().__init__(model_name)
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.chunk_size = chunk_size
+        self.first_chunk_share = first_chunk_share
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self.recordings = {}
+        if recordings_path:
+            self.recordings = load_recordings(recordings_path)
+
+    def _draw(self):
+        """This call's latency in seconds and whether it fails."""
+        with self._lock:
+            delay = self.latency_ms + self._random.uniform(-self.jitter_ms, self.jitter_ms)
+            failed = self._random.random() < self.error_rate
+        return max(delay, 0) / 1000, failed
+
+    @staticmethod
+    def _wait(seconds, failed=False):
+        if seconds > 0:
+            time.sleep(seconds)
+        if failed:
+            raise FakeRateLimitError("429 Resource has been exhausted (injected by fake provider)")
+
+    def response_for(self, prompt):
+        key = prompt_hash(prompt)
+        if key in self.recordings:
+            return self.recordings[key]
+        return json.dumps(synthetic_response(prompt, key))
+
+    def generate(self, prompt):
+        self._wait(*self._draw())
+        return self.response_for(prompt)
+
+    def stream(self, prompt):
+        # Latency is split between time-to-first-chunk and the rest of the response
+        text = self.response_for(prompt)
+        chunks = [text[i:i + self.chunk_size] for i in range(0, len(text), self.chunk_size)] or ['']
+        delay, failed = self._draw()
+        first = delay * self.first_chunk_share
+        self._wait(first, failed)
+        between = (delay - first) / max(len(chunks) - 1, 1)
+        for index, chunk in enumerate(chunks):
+            if index:
+                self._wait(between)
+            yield chunk
+
+
+def synthetic_response(prompt, key):
+    seed = int(key[:8], 16)
+
+    def analysis(offset):
+        score = (seed + offset * 37) % 101
+        return {
+            "summary": "Synthetic analysis produced by the fake LLM provider.",
+            "skills": ["Python", "SQL", "Communication"][:1 + (seed + offset) % 3],
+            "experience_level": ["Junior", "Mid", "Senior", "Lead"][(seed + offset) % 4],
+            "years_of_experience": f"{(seed + offset) % 10}+ years",
+            "education": "Unknown",
+            "strengths": [],
+            "weaknesses": [],
+            "match_score": score if "Job Description:" in prompt else None,
+            "classification": "Software Engineer",
+            "recommendation": "Interview" if score >= 50 else "Hold"
+        }
+
+    # Batch prompts number their candidates, answer with one object per candidate
+    candidates = re.findall(r'^=== Candidate (\d+) ===$', prompt, re.M)
+    if candidates:
+        return [dict(analysis(int(c)), candidate_id=int(c)) for c in candidates]
+    return analysis(0)
+
+
+def load_recordings(path):
+    recordings = {}
+    try:
+        with open(path, encoding='utf-8') as f:
+            for line in f:
+                if line.strip():
+                    record = json.loads(line)
+                    recordings[record['prompt_hash']] = record['response']
+    except (OSError, ValueError, KeyError) as e:
+        print(f"Could not load LLM recordings from {path}: {e}")
+    return recordings
+
+
+class RecordingProvider(LLMProvider):
+    """Wraps another provider and appends every prompt hash and response to a JSONL file for FakeProvider."""
+
+    def __init__(self, provider, path):
+        super().__init__(provider.model_name)
+        self.provider = provider
+        self.name = provider.name
+        self.path = path
+        self._lock = threading.Lock()
+
+    @property
+    def available(self):
+        return self.provider.available
+
+    def _record(self, prompt, response):
+        record = {'prompt_hash': prompt_hash(prompt), 'provider': self.name,
+                  'model': self.model_name, 'response': response}
+        with self._lock:
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(record) + '\n')
+
+    def generate(self, prompt):
+        response = self.provider.generate(prompt)
+        self._record(prompt, response)
+        return response
+
+    def stream(self, prompt):
+        chunks = []
+        for chunk in self.provider.stream(prompt):
+            chunks.append(chunk)
+            yield chunk
+        self._record(prompt, ''.join(chunks))
+
+
+def get_provider():
+    """
+    Builds the provider selected by LLM_PROVIDER (gemini, openai or fake) for the
+    model in LLM_MODEL. With LLM_RECORD_PATH set, responses are also recorded there.
+    """
+    name = os.getenv('LLM_PROVIDER', 'gemini').lower()
+    if name not in DEFAULT_MODELS:
+        raise ValueError(f"Unknown LLM_PROVIDER: {name}")
+    model_name = os.getenv('LLM_MODEL') or DEFAULT_MODELS[name]
+
+    if name == 'gemini':
+        provider = GeminiProvider(model_name)
+    elif name == 'openai':
+        provider = OpenAIProvider(model_name)
+    else:
+        seed = os.getenv('LLM_FAKE_SEED')
+        provider = FakeProvider(
+            model_name,
+            recordings_path=os.getenv('LLM_FAKE_RECORDINGS'),
+            latency_ms=float(os.getenv('LLM_FAKE_LATENCY_MS') or 0),
+            jitter_ms=float(os.getenv('LLM_FAKE_JITTER_MS') or 0),
+            error_rate=float(os.getenv('LLM_FAKE_ERROR_RATE') or 0),
+            seed=int(seed) if seed else None
+        )
+
+    record_path = os.getenv('LLM_RECORD_PATH')
+    if record_path:
+        provider = RecordingProvider(provider, record_path)
+    return provider
@@ -0,0 +1,303 @@
+import os
+import time
+import random
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+DEFAULT_LIMITER_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+    'instance', 'llm_limiter.db'
+)
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+
+class RateLimitExceeded(Exception):
+    """No request slot or rate-limit token became available in time."""
+
+
+class CircuitOpenError(Exception):
+    """The provider is considered unhealthy and calls are being short-circuited."""
+
+
+def is_rate_limit_error(error):
+    """True for provider errors meaning "too many requests" (HTTP 429 / RESOURCE_EXHAUSTED)."""
+    for attr in ('code', 'status_code', 'http_status'):
+        if getattr(error, attr, None) == 429:
+            return True
+    if type(error).__name__ in ('ResourceExhausted', 'RateLimitError', 'TooManyRequests'):
+        return True
+    message = str(error)
+    return '429' in message or 'RESOURCE_EXHAUSTED' in message
+
+
+class RateLimiter:
+    """
+    Coordinates outbound LLM calls.
+
+    - A token bucket (rate requests per second, up to burst at once) stored in a
+      small SQLite file, so every thread and worker process on the host draws from
+      the same budget.
+    - A per-process cap on requests in flight.
+    - Exponential backoff with full jitter when the provider answers 429.
+    - A circuit breaker, also shared through the SQLite file: after
+      failure_threshold consecutive failures calls fail immediately with
+      CircuitOpenError for reset_timeout seconds, then a single probe call is let
+      through and its outcome closes or re-opens the circuit.
+    """
+
+    def __init__(self, name='default', path=None, rate=1.0, burst=10, max_in_flight=4, max_retries=3,
+                 backoff_base=1.0, backoff_max=30.0, failure_threshold=5, reset_timeout=30.0,
+                 acquire_timeout=30.0):
+        self.name = name
+        self.path = path or DEFAULT_LIMITER_PATH
+        self.rate = rate
+        self.burst = burst
+        self.max_in_flight = max_in_flight
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.acquire_timeout = acquire_timeout
+
+        self._slots = threading.BoundedSemaphore(max_in_flight) if max_in_flight else None
+        self._in_flight = 0
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._counters = {
+            'calls': 0, 'succeeded': 0, 'failed': 0, 'rate_limited': 0,
+            'retries': 0, 'throttled': 0, 'short_circuited': 0,
+        }
+
+        if self.path != ':memory:':
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        with self._transaction() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS llm_limiter ("
+                " name TEXT PRIMARY KEY,"
+                " tokens REAL NOT NULL,"
+                " updated_at REAL NOT NULL,"
+                " state TEXT NOT NULL,"
+                " failures INTEGER NOT NULL,"
+                " opened_at REAL)"
+            )
+            conn.execute(
+                "INSERT OR IGNORE INTO llm_limiter (name, tokens, updated_at, state, failures, opened_at)"
+                " VALUES (?, ?, ?, ?, 0, NULL)",
+                (self.name, float(self.burst), time.time(), CLOSED)
+            )
+
+    def _conn(self):
+        # sqlite3 connections cannot be shared across threads, keep one per thread.
+        # Autocommit mode so transactions are opened explicitly with BEGIN IMMEDIATE.
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    @contextmanager
+    def _transaction(self):
+        # IMMEDIATE takes the write lock up front, so read-modify-write of the
+        # shared row is atomic across processes
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+    def _count(self, counter):
+        with self._lock:
+            self._counters[counter] += 1
+
+    def _take_token(self):
+        """Takes one token from the shared bucket. Returns 0 on success, else seconds until one is available."""
+        with self._transaction() as conn:
+            tokens, updated_at = conn.execute(
+                "SELECT tokens, updated_at FROM llm_limiter WHERE name = ?", (self.name,)
+            ).fetchone()
+            now = time.time()
+            tokens = min(float(self.burst), tokens + max(0.0, now - updated_at) * self.rate)
+            wait = 0.0
+            if tokens >= 1:
+                tokens -= 1
+            else:
+                wait = (1 - tokens) / self.rate
+            conn.execute("UPDATE llm_limiter SET tokens = ?, updated_at = ? WHERE name = ?",
+                         (tokens, now, self.name))
+        return wait
+
+    def acquire_token(self, deadline):
+        if not self.rate:
+            return
+        throttled = False
+        while True:
+            wait = self._take_token()
+            if not wait:
+                return
+            if not throttled:
+                throttled = True
+                self._count('throttled')
+            if time.monotonic() + wait > deadline:
+                raise RateLimitExceeded("Timed out waiting for the LLM rate limit")
+            # Competing callers may take the token first, so re-check instead of assuming it is ours
+            time.sleep(wait * random.uniform(1.0, 1.2))
+
+    def allow(self):
+        """Whether a call may go out now; moves an open circuit to half-open once reset_timeout has passed."""
+        if not self.failure_threshold:
+            return True
+        with self._transaction() as conn:
+            state, opened_at = conn.execute(
+                "SELECT state, opened_at FROM llm_limiter WHERE name = ?", (self.name,)
+            ).fetchone()
+            if state == CLOSED:
+                return True
+            now = time.time()
+            # In half-open, opened_at marks when the probe started; a probe that never
+            # reported back (its process died) stops blocking after reset_timeout
+            if now - (opened_at or 0) < self.reset_timeout:
+                return False
+            conn.execute("UPDATE llm_limiter SET state = ?, opened_at = ? WHERE name = ?",
+                         (HALF_OPEN, now, self.name))
+            return True
+
+    def record_success(self):
+        self._count('succeeded')
+        if not self.failure_threshold:
+            return
+        with self._transaction() as conn:
+            conn.execute("UPDATE llm_limiter SET state = ?, failures = 0, opened_at = NULL WHERE name = ?",
+                         (CLOSED, self.name))
+
+    def record_failure(self):
+        self._count('failed')
+        if not self.failure_threshold:
+            return
+        with self._transaction() as conn:
+            state, failures = conn.execute(
+                "SELECT state, failures FROM llm_limiter WHERE name = ?", (self.name,)
+            ).fetchone()
+            failures += 1
+            if state == HALF_OPEN or failures >= self.failure_threshold:
+                conn.execute("UPDATE llm_limiter SET state = ?, failures = ?, opened_at = ? WHERE name = ?",
+                             (OPEN, failures, time.time(), self.name))
+            else:
+                conn.execute("UPDATE llm_limiter SET failures = ? WHERE name = ?", (failures, self.name))
+
+    @contextmanager
+    def _slot(self, deadline):
+        if self._slots is not None:
+            if not self._slots.acquire(timeout=max(0.0, deadline - time.monotonic())):
+                self._count('throttled')
+                raise RateLimitExceeded("Too many LLM requests in flight")
+        with self._lock:
+            self._in_flight += 1
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._in_flight -= 1
+            if self._slots is not None:
+                self._slots.release()
+
+    def _backoff(self, attempt):
+        # Full jitter: callers that were rejected together spread out instead of retrying in lockstep
+        delay = min(self.backoff_max, self.backoff_base * (2 ** attempt))
+        time.sleep(random.uniform(0, delay))
+
+    def call(self, fn, *args, **kwargs):
+        """
+        Calls fn(*args, **kwargs) under the limiter. 429 responses are retried with
+        backoff up to max_retries times; any other error is raised at once.
+        Raises CircuitOpenError without calling fn while the circuit is open.
+        """
+        if not self.allow():
+            self._count('short_circuited')
+            raise CircuitOpenError("LLM provider circuit is open")
+        self._count('calls')
+        deadline = time.monotonic() + self.acquire_timeout
+        with self._slot(deadline):
+            attempt = 0
+            while True:
+                self.acquire_token(deadline)
+                try:
+                    result = fn(*args, **kwargs)
+                except Exception as e:
+                    if is_rate_limit_error(e):
+                        self._count('rate_limited')
+                        if attempt < self.max_retries:
+                            self._count('retries')
+                            self._backoff(attempt)
+                            attempt += 1
+                            continue
+                    self.record_failure()
+                    raise
+                self.record_success()
+                return result
+
+    def stream(self, fn, *args, **kwargs):
+        """
+        Like call, for functions returning an iterator of chunks. The request slot is
+        held until the stream is exhausted or closed; only errors raised before the
+        first chunk are retried.
+        """
+        if not self.allow():
+            self._count('short_circuited')
+            raise CircuitOpenError("LLM provider circuit is open")
+        self._count('calls')
+        deadline = time.monotonic() + self.acquire_timeout
+        with self._slot(deadline):
+            attempt = 0
+            while True:
+                self.acquire_token(deadline)
+                started = False
+                try:
+                    for chunk in fn(*args, **kwargs):
+                        started = True
+                        yield chunk
+                except Exception as e:
+                    if is_rate_limit_error(e):
+                        self._count('rate_limited')
+                        if not started and attempt < self.max_retries:
+                            self._count('retries')
+                            self._backoff(attempt)
+                            attempt += 1
+                            continue
+                    self.record_failure()
+                    raise
+                self.record_success()
+                return
+
+    def stats(self):
+        conn = self._conn()
+        tokens, updated_at, state, failures, opened_at = conn.execute(
+            "SELECT tokens, updated_at, state, failures, opened_at FROM llm_limiter WHERE name = ?", (self.name,)
+        ).fetchone()
+        tokens = min(float(self.burst), tokens + max(0.0, time.time() - updated_at) * self.rate)
+        with self._lock:
+            result = dict(self._counters)
+            result['in_flight'] = self._in_flight
+        result.update({
+            'name': self.name,
+            'rate_per_second': self.rate,
+            'burst': self.burst,
+            'tokens_available': round(tokens, 2),
+            'max_in_flight': self.max_in_flight,
+            'circuit': {
+                'state': state,
+                'consecutive_failures': failures,
+                'opened_at': opened_at,
+                'failure_threshold': self.failure_threshold,
+                'reset_timeout': self.reset_timeout
+            }
+        })
+        return result
@@ -0,0 +1,66 @@
+import os
+import zlib
+import hashlib
+import tempfile
+import threading
+
+DEFAULT_STORE_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+    'instance', 'extracted_text'
+)
+
+def file_sha256(file_path, chunk_size=1024 * 1024):
+    h = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            h.update(chunk)
+    return h.hexdigest()
+
+class TextStore:
+    """
+    Extracted text stored once per file content, as zlib-compressed files named
+    <sha256>.v<extractor version>.z. Bumping the extractor version makes old
+    entries invisible, so improved extraction is picked up without a migration.
+    """
+
+    def __init__(self, directory=None):
+        self.directory = directory or DEFAULT_STORE_DIR
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def _path(self, sha256, version):
+        # Two-character fan-out keeps directories small
+        return os.path.join(self.directory, sha256[:2], f"{sha256}.v{version}.z")
+
+    def get(self, sha256, version):
+        try:
+            with open(self._path(sha256, version), 'rb') as f:
+                text = zlib.decompress(f.read()).decode('utf-8')
+        except (OSError, zlib.error, UnicodeDecodeError):
+            with self._lock:
+                self.misses += 1
+            return None
+        with self._lock:
+            self.hits += 1
+        return text
+
+    def put(self, sha256, version, text):
+        path = self._path(sha256, version)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # Write to a temporary file and rename so readers never see a partial entry
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path))
+            with os.fdopen(fd, 'wb') as f:
+                f.write(zlib.compress(text.encode('utf-8'), 6))
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"Text store write error: {e}")
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / total, 4) if total else 0.0
+        }
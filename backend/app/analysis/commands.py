@@ -0,0 +1,27 @@
+import click
+from app.ai_engine.analyzer import get_analyzer
+from . import bp
+
+@bp.cli.command('clear-cache')
+@click.option('--all', 'clear_all', is_flag=True, help='Drop every cached result, not only stale ones.')
+def clear_cache(clear_all):
+    """Invalidates cached analysis results (run after editing the prompt)."""
+    analyzer = get_analyzer()
+    if not analyzer.cache:
+        click.echo('Analysis cache is disabled.')
+        return
+    if clear_all:
+        removed = analyzer.cache.invalidate()
+    else:
+        removed = analyzer.cache.invalidate(prompt_version=analyzer.prompt_version, model_name=analyzer.model_name)
+    click.echo(f'Removed {removed} cached analyses.')
+
+@bp.cli.command('cache-stats')
+def cache_stats():
+    """Prints the size of the analysis cache."""
+    analyzer = get_analyzer()
+    if not analyzer.cache:
+        click.echo('Analysis cache is disabled.')
+        return
+    for name, value in analyzer.cache.stats().items():
+        click.echo(f'{name}: {value}')
@@ -1,15 +1,40 @@
-from flask import jsonify, request
+from flask import jsonify, request, Response, stream_with_context
 from flask_jwt_extended import jwt_required, get_jwt_identity, get_jwt
 from app import db
-from app.models import Application, Job
-from app.ai_engine.analyzer import analyzer
+from app.models import Application, Job, Resume, AnalysisTask
+from app.ai_engine.analyzer import get_analyzer
+from app.analysis.tasks import applicant_corpus, save_application_result
+from app.ai_engine.extraction import get_store, stats as extraction_stats
+from app.ai_engine.compaction import stats as compaction_stats
 from . import bp
 import os
+import json
 
 @bp.route('/', methods=['GET'])
 def analyze():
     return jsonify({'message': 'Analysis endpoint'}), 200
 
+@bp.route('/stats', methods=['GET'])
+@jwt_required()
+def analysis_stats():
+    claims = get_jwt()
+    if claims.get('role') != 'recruiter':
+        return jsonify({'error': 'Access denied. Recruiters only.'}), 403
+
+    analyzer = get_analyzer()
+    return jsonify({
+        'mode': analyzer.mode,
+        'provider': analyzer.provider.name,
+        'model': analyzer.model_name,
+        'prompt_version': analyzer.prompt_version,
+        'token_budget': analyzer.token_budget,
+        'cache': analyzer.cache.stats() if analyzer.cache else None,
+        'text_store': get_store().stats() if get_store() else None,
+        'extraction': extraction_stats(),
+        'compaction': compaction_stats(),
+        'rate_limiter': analyzer.limiter.stats() if analyzer.limiter else None
+    }), 200
+
 @bp.route('/<int:application_id>', methods=['POST'])
 @jwt_required()
 def analyze_application(application_id):
@@ -24,20 +49,116 @@ def analyze_application(application_id):
         return jsonify({'error': 'Resume file not found'}), 404
 
     # Parse Resume
+    analyzer = get_analyzer()
     resume_text = analyzer.extract_text(application.resume_path)
     if not resume_text:
         return jsonify({'error': 'Failed to parse resume'}), 500
 
     # Analyze
-    analysis_result = analyzer.analyze_resume(resume_text, job.description)
+    analysis_result = analyzer.analyze_resume(resume_text, job.match_text, applicant_corpus(analyzer, application))
     
-    # Update Application
-    application.score = analysis_result.get('match_score', 0)
-    application.analysis_summary = analysis_result.get('summary', 'No summary generated.')
+    # Update Application: score, summary, skills and its search index
+    save_application_result(application, analysis_result, resume_text)
+    application.analysis_status = 'done'
     db.session.commit()
 
     return jsonify({
         'message': 'Analysis complete',
         'score': application.score,
-        'summary': application.analysis_summary
+        'summary': application.analysis_summary,
+        'compaction': analysis_result.get('compaction')
+    }), 200
+
+@bp.route('/<int:application_id>/stream', methods=['POST'])
+@jwt_required()
+def analyze_application_stream(application_id):
+    """
+    Same as analyze_application, but streams the analysis as Server-Sent Events:
+    summary, skills and score events as the model produces them, then a done
+    event once the result has been saved to the application.
+    """
+    claims = get_jwt()
+    if claims.get('role') != 'recruiter':
+        return jsonify({'error': 'Access denied. Recruiters only.'}), 403
+
+    application = Application.query.get_or_404(application_id)
+    job = Job.query.get(application.job_id)
+
+    if not os.path.exists(application.resume_path):
+        return jsonify({'error': 'Resume file not found'}), 404
+
+    def sse(event, data):
+        return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+    def generate():
+        # First byte goes out before extraction or the model call starts
+        yield sse('status', {'status': 'running'})
+
+        analyzer = get_analyzer()
+        resume_text = analyzer.extract_text(application.resume_path)
+        if not resume_text:
+            yield sse('error', {'error': 'Failed to parse resume'})
+            return
+
+        corpus = applicant_corpus(analyzer, application)
+        for field, value in analyzer.analyze_resume_stream(resume_text, job.match_text, corpus):
+            if field == 'result':
+                save_application_result(application, value, resume_text)
+                application.analysis_status = 'done'
+                db.session.commit()
+                yield sse('done', {
+                    'message': 'Analysis complete',
+                    'score': application.score,
+                    'summary': application.analysis_summary,
+                    'compaction': value.get('compaction')
+                })
+            else:
+                yield sse('score' if field == 'match_score' else field, value)
+
+    return Response(stream_with_context(generate()), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        # Stop reverse proxies (nginx) from buffering the stream
+        'X-Accel-Buffering': 'no'
+    })
+
+@bp.route('/tasks/<int:task_id>', methods=['GET'])
+@jwt_required()
+def get_task_status(task_id):
+    task = AnalysisTask.query.get_or_404(task_id)
+    current_user_id = get_jwt_identity()
+
+    result = None
+    if task.kind == 'application':
+        application = Application.query.get_or_404(task.target_id)
+        job = Job.query.get(application.job_id)
+        # Visible to the applicant and to the recruiter who owns the job
+        if str(application.student_id) != str(current_user_id) and str(job.recruiter_id) != str(current_user_id):
+            return jsonify({'error': 'Access denied.'}), 403
+        if task.status == 'done':
+            result = {'score': application.score, 'summary': application.analysis_summary}
+    elif task.kind == 'job_rescore':
+        job = Job.query.get_or_404(task.target_id)
+        if str(job.recruiter_id) != str(current_user_id):
+            return jsonify({'error': 'Access denied. You do not own this job.'}), 403
+        if task.status == 'done':
+            result = {'applications': Application.query.filter_by(job_id=job.id).count()}
+    elif task.kind == 'resume':
+        resume = Resume.query.get_or_404(task.target_id)
+        if str(resume.student_id) != str(current_user_id):
+            return jsonify({'error': 'Access denied.'}), 403
+        if task.status == 'done':
+            result = {
+                'summary': resume.analysis_summary,
+                'skills': resume.skills.split(', ') if resume.skills else [],
+                'experience_level': resume.experience_level
+            }
+
+    return jsonify({
+        'id': task.id,
+        'kind': task.kind,
+        'target_id': task.target_id,
+        'status': task.status,
+        'attempts': task.attempts,
+        'error': task.last_error if task.status == 'failed' else None,
+        'result': result
     }), 200
@@ -0,0 +1,260 @@
+import os
+import socket
+import threading
+import traceback
+from functools import partial
+from datetime import datetime, timedelta
+from flask import current_app
+from sqlalchemy import or_, and_
+from app import db
+from app.models import AnalysisTask, Application, Resume, Job
+from app.ai_engine.analyzer import get_analyzer
+from app.ai_engine.extraction import get_pool
+from app.search import index_application, index_resume
+
+# Wakes up in-process workers as soon as something is enqueued instead of waiting for the next poll
+_wakeup = threading.Event()
+
+def enqueue(kind, target_id):
+    """
+    Adds an analysis task to the current session. The caller commits it together
+    with the row it refers to, so a task can never point at a row that was rolled back.
+    """
+    task = AnalysisTask(kind=kind, target_id=target_id, status='queued')
+    db.session.add(task)
+    _wakeup.set()
+    return task
+
+def _claimable():
+    now = datetime.utcnow()
+    return or_(
+        AnalysisTask.status == 'queued',
+        and_(AnalysisTask.status == 'running', AnalysisTask.lease_expires_at < now)
+    )
+
+def claim_task(worker_id):
+    """
+    Leases the oldest runnable task to worker_id. The conditional UPDATE makes the
+    claim atomic, so several worker processes can poll the same table safely.
+    """
+    lease = timedelta(seconds=current_app.config['ANALYSIS_LEASE_SECONDS'])
+    while True:
+        candidate = AnalysisTask.query.filter(_claimable()).order_by(AnalysisTask.id).first()
+        if not candidate:
+            db.session.rollback()
+            return None
+
+        claimed = AnalysisTask.query.filter(AnalysisTask.id == candidate.id, _claimable()).update({
+            'status': 'running',
+            'lease_owner': worker_id,
+            'lease_expires_at': datetime.utcnow() + lease,
+            'attempts': AnalysisTask.attempts + 1,
+            'updated_at': datetime.utcnow()
+        }, synchronize_session=False)
+        db.session.commit()
+
+        if claimed:
+            return db.session.get(AnalysisTask, candidate.id)
+        # Another worker won the race for this row, try the next one
+
+class LeaseLost(Exception):
+    """The task's lease expired and another worker has claimed it."""
+
+def renew_lease(task, worker_id):
+    """
+    Extends worker_id's lease on a running task by another ANALYSIS_LEASE_SECONDS.
+    Long tasks call it between steps; raises LeaseLost once another worker has reclaimed the task.
+    """
+    lease = timedelta(seconds=current_app.config['ANALYSIS_LEASE_SECONDS'])
+    renewed = AnalysisTask.query.filter_by(id=task.id, lease_owner=worker_id, status='running').update({
+        'lease_expires_at': datetime.utcnow() + lease,
+        'updated_at': datetime.utcnow()
+    }, synchronize_session=False)
+    db.session.commit()
+    if not renewed:
+        raise LeaseLost(f'Lease on analysis task {task.id} was lost')
+
+def _set_target_status(task, status):
+    model = {'application': Application, 'resume': Resume}.get(task.kind)
+    if model:
+        model.query.filter_by(id=task.target_id).update({'analysis_status': status}, synchronize_session=False)
+
+def _finish(task, worker_id, status, error=None):
+    # Only the current lease holder may record the outcome; a worker whose lease
+    # expired and was reclaimed must not overwrite the newer attempt
+    finished = AnalysisTask.query.filter_by(id=task.id, lease_owner=worker_id, status='running').update({
+        'status': status,
+        'last_error': error,
+        'lease_owner': None,
+        'lease_expires_at': None,
+        'updated_at': datetime.utcnow()
+    }, synchronize_session=False)
+    if finished:
+        _set_target_status(task, status)
+    db.session.commit()
+    return finished
+
+def applicant_corpus(analyzer, application):
+    """
+    Resume texts of the job's other (most recent) applicants, which the local scorer
+    needs for IDF: over a single resume IDF is constant and the score would be plain
+    term overlap, not comparable with a rescore of the whole job. The texts come from
+    the text store, so this extracts nothing already extracted. Empty when the LLM scores.
+    """
+    if analyzer.use_llm:
+        return []
+    paths = [row.resume_path for row in Application.query.with_entities(Application.resume_path).filter(
+        Application.job_id == application.job_id, Application.id != application.id
+    ).order_by(Application.id.desc()).limit(current_app.config['LOCAL_SCORER_CORPUS_SIZE'])]
+    return [text for text in analyzer.extract_texts(paths) if text]
+
+def analyze_application(application):
+    analyzer = get_analyzer()
+    text = analyzer.extract_text(application.resume_path)
+    if not text:
+        application.analysis_summary = "Text extraction failed."
+        return
+
+    # Get Job Description for comparison
+    job = db.session.get(Job, application.job_id)
+    job_desc = job.match_text if job else None
+
+    analysis_result = analyzer.analyze_resume(text, job_description=job_desc,
+                                              corpus=applicant_corpus(analyzer, application))
+    save_application_result(application, analysis_result, text)
+
+def save_application_result(application, analysis_result, text):
+    """
+    Stores an analysis on its application and re-indexes it for search. Shared by the
+    workers and the synchronous / streaming analysis endpoints; the caller commits.
+    """
+    application.score = analysis_result.get('match_score', 0)
+    application.analysis_summary = analysis_result.get('summary', 'Analysis failed.')
+    application.skills = ', '.join(analysis_result.get('skills', []))
+    # Indexed in the caller's transaction, searchable once the analysis is committed
+    index_application(application, text)
+
+def analyze_resume(resume):
+    analyzer = get_analyzer()
+    text = analyzer.extract_text(resume.file_path)
+    if not text:
+        # Fallback if text extraction fails
+        resume.analysis_summary = "Text extraction failed."
+        return
+
+    analysis_result = analyzer.analyze_resume(text)
+    resume.analysis_summary = analysis_result.get('summary', 'Analysis failed.')
+    resume.skills = ', '.join(analysis_result.get('skills', []))
+    resume.experience_level = analysis_result.get('experience_level', 'Unknown')
+    index_resume(resume, text)
+
+def rescore_job(job, renew_lease=None):
+    """
+    Re-scores every application of a job, packing several resumes per LLM request.
+    A large job takes many rate-limited requests, so renew_lease is called after text
+    extraction and before every pack to keep the task's lease from expiring meanwhile.
+    """
+    renew_lease = renew_lease or (lambda: None)
+    applications = Application.query.filter_by(job_id=job.id).all()
+    application_ids = [application.id for application in applications]
+
+    analyzer = get_analyzer()
+    texts = analyzer.extract_texts([application.resume_path for application in applications])
+    resumes = list(zip(application_ids, texts))
+    text_by_id = dict(resumes)
+    renew_lease()
+
+    results = analyzer.analyze_batch(resumes, job.match_text, on_pack=renew_lease)
+    # Renewing commits, which expires the loaded rows: reload them in one query
+    applications = Application.query.filter(Application.id.in_(application_ids)).all() if application_ids else []
+    for application in applications:
+        analysis_result = results.get(application.id) or {}
+        if 'error' in analysis_result:
+            application.analysis_summary = "Text extraction failed."
+        else:
+            save_application_result(application, analysis_result, text_by_id[application.id])
+        application.analysis_status = 'done'
+    # run_task commits all scores in a single transaction
+
+HANDLERS = {
+    'application': (Application, analyze_application),
+    'resume': (Resume, analyze_resume),
+    'job_rescore': (Job, rescore_job),
+}
+
+def run_task(task, worker_id):
+    model, handler = HANDLERS[task.kind]
+    target = db.session.get(model, task.target_id)
+    if target is None:
+        return _finish(task, worker_id, 'failed', f'{task.kind} {task.target_id} no longer exists')
+
+    if hasattr(target, 'analysis_status'):
+        target.analysis_status = 'running'
+        db.session.commit()
+    if task.kind == 'job_rescore':
+        handler = partial(handler, renew_lease=partial(renew_lease, task, worker_id))
+    try:
+        handler(target)
+        db.session.commit()
+    except LeaseLost as e:
+        # Another worker is running the task now and will record its outcome
+        db.session.rollback()
+        print(f"Analysis task {task.id} abandoned: {e}")
+        return 0
+    except Exception as e:
+        db.session.rollback()
+        print(f"Analysis task {task.id} failed: {e}")
+        traceback.print_exc()
+        if task.attempts < current_app.config['ANALYSIS_MAX_ATTEMPTS']:
+            # Put it back in the queue for another attempt
+            return _finish(task, worker_id, 'queued', str(e))
+        return _finish(task, worker_id, 'failed', str(e))
+    return _finish(task, worker_id, 'done')
+
+def work_once(worker_id):
+    """Claims and runs at most one task. Returns True if a task was processed."""
+    task = claim_task(worker_id)
+    if task is None:
+        return False
+    run_task(task, worker_id)
+    return True
+
+class WorkerPool:
+    """Runs analysis tasks on a handful of daemon threads inside the current process."""
+
+    def __init__(self, app, size=None):
+        self.app = app
+        self.size = size if size is not None else app.config['ANALYSIS_WORKERS']
+        self.threads = []
+        self._stop = threading.Event()
+
+    def start(self):
+        # Load the analyzer and boot the text extraction processes now rather than on the first task
+        get_analyzer()
+        get_pool()
+        prefix = f"{socket.gethostname()}:{os.getpid()}"
+        for i in range(self.size):
+            t = threading.Thread(target=self._loop, args=(f"{prefix}:{i}",), daemon=True, name=f"analysis-worker-{i}")
+            t.start()
+            self.threads.append(t)
+        return self
+
+    def stop(self, timeout=None):
+        self._stop.set()
+        _wakeup.set()
+        for t in self.threads:
+            t.join(timeout)
+
+    def _loop(self, worker_id):
+        interval = self.app.config['ANALYSIS_POLL_INTERVAL']
+        while not self._stop.is_set():
+            processed = False
+            with self.app.app_context():
+                try:
+                    processed = work_once(worker_id)
+                except Exception as e:
+                    db.session.rollback()
+                    print(f"Analysis worker {worker_id} error: {e}")
+            if not processed:
+                _wakeup.wait(interval)
+                _wakeup.clear()
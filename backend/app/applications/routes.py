@@ -1,10 +1,13 @@
-from flask import jsonify, request, current_app
+from flask import jsonify, request
 from flask_jwt_extended import jwt_required, get_jwt_identity, get_jwt
-from werkzeug.utils import secure_filename
-from app import db
-from app.models import Application, Job
-import os
-from app.ai_engine.analyzer import analyzer
+from sqlalchemy import func
+from sqlalchemy.exc import IntegrityError
+from app import db, storage
+from app.models import Application, Job, application_rank
+from app.analysis.tasks import enqueue
+from app.pagination import paginate
+from app.jobs import counters
+from app.search import resume_index, resume_doc_id
 from . import bp
 
 ALLOWED_EXTENSIONS = {'pdf', 'docx', 'doc'}
@@ -33,51 +36,43 @@ def apply_job():
         return jsonify({'error': 'Job ID is required'}), 400
 
     if file and allowed_file(file.filename):
-        filename = secure_filename(file.filename)
         student_id = get_jwt_identity()
-        
-        # Ensure upload directory exists
-        upload_folder = os.path.join(current_app.root_path, '..', 'uploads', 'resumes')
-        os.makedirs(upload_folder, exist_ok=True)
-        
-        # Save file with unique name to prevent overwrites
-        unique_filename = f"{student_id}_{job_id}_{filename}"
-        file_path = os.path.join(upload_folder, unique_filename)
-        file.save(file_path)
 
         # Check if already applied
         existing_application = Application.query.filter_by(student_id=student_id, job_id=job_id).first()
         if existing_application:
             return jsonify({'error': 'You have already applied for this job'}), 400
 
+        # Stored once per content: applying to several jobs with the same resume keeps one copy
+        extension = file.filename.rsplit('.', 1)[1].lower()
+        file_sha256, file_path = storage.store(file.stream, extension)
+
         application = Application(
             job_id=job_id,
             student_id=student_id,
-            resume_path=file_path
+            resume_path=file_path,
+            file_sha256=file_sha256,
+            analysis_status='queued'
         )
-        
-        # Perform AI Analysis
+        db.session.add(application)
         try:
-            text = analyzer.extract_text(file_path)
-            if text:
-                # Get Job Description for comparison
-                job = Job.query.get(job_id)
-                job_desc = job.description if job else None
-                
-                analysis_result = analyzer.analyze_resume(text, job_description=job_desc)
-                
-                application.score = analysis_result.get('match_score', 0)
-                application.analysis_summary = analysis_result.get('summary', 'Analysis failed.')
-            else:
-                application.analysis_summary = "Text extraction failed."
-        except Exception as e:
-            print(f"Analysis error: {e}")
-            application.analysis_summary = "Analysis failed due to server error."
+            db.session.flush()
+        except IntegrityError:
+            # A concurrent request for the same job got past the check above first
+            db.session.rollback()
+            return jsonify({'error': 'You have already applied for this job'}), 400
+        counters.adjust(application.job_id, application.status, 1)
 
-        db.session.add(application)
+        # AI Analysis runs on the background workers, poll /api/analysis/tasks/<task_id> for the result
+        task = enqueue('application', application.id)
         db.session.commit()
 
-        return jsonify({'message': 'Application submitted successfully', 'application_id': application.id}), 201
+        return jsonify({
+            'message': 'Application submitted successfully',
+            'application_id': application.id,
+            'analysis_status': application.analysis_status,
+            'task_id': task.id
+        }), 201
 
     return jsonify({'error': 'Invalid file type. Only PDF and DOCX allowed.'}), 400
 
@@ -85,19 +80,24 @@ def apply_job():
 @jwt_required()
 def my_applications():
     student_id = get_jwt_identity()
-    applications = Application.query.filter_by(student_id=student_id).all()
+    # Only the columns the listing shows, with the job title joined in: one query per page
+    query = db.session.query(
+        Application.id, Application.created_at, Application.status, Application.analysis_status,
+        Job.title.label('job_title')
+    ).outerjoin(Job, Job.id == Application.job_id).filter(Application.student_id == student_id)
+    applications, headers = paginate(query, [Application.created_at, Application.id])
     
     result = []
     for app in applications:
-        job = Job.query.get(app.job_id)
         result.append({
             'id': app.id,
-            'job_title': job.title if job else 'Unknown Job',
+            'job_title': app.job_title or 'Unknown Job',
             'applied_at': app.created_at.isoformat(),
-            'status': app.status
+            'status': app.status,
+            'analysis_status': app.analysis_status
         })
     
-    return jsonify(result), 200
+    return jsonify(result), 200, headers
 
 @bp.route('/<int:application_id>/status', methods=['PUT'])
 @jwt_required()
@@ -119,9 +119,128 @@ def update_application_status(application_id):
     new_status = data.get('status')
     
     if new_status:
-        application.status = new_status
+        if new_status not in counters.APPLICATION_STATUSES:
+            return jsonify({'error': f"Status must be one of: {', '.join(counters.APPLICATION_STATUSES)}"}), 400
+        if not counters.set_status(application, new_status):
+            db.session.rollback()
+            return jsonify({'error': 'Application was updated by another request, please retry'}), 409
         db.session.commit()
         return jsonify({'message': 'Application status updated successfully'}), 200
     
     return jsonify({'error': 'Status is required'}), 400
 
+# Most applications one bulk status request may name by id
+BULK_MAX_IDS = 5000
+
+# Predicate keys accepted by the bulk status update, applied to the score
+SCORE_FILTERS = {
+    'score_lt': lambda value: Application.score < value,
+    'score_lte': lambda value: Application.score <= value,
+    'score_gt': lambda value: Application.score > value,
+    'score_gte': lambda value: Application.score >= value,
+}
+
+def _is_number(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+@bp.route('/status', methods=['PUT'])
+@jwt_required()
+def bulk_update_status():
+    """
+    Sets the status of many applications at once, chosen either by id
+    ({"status": ..., "application_ids": [...]}) or by a predicate over one job
+    ({"status": ..., "job_id": ..., "filter": {"score_lt": 40}}). Filter keys:
+    score_lt, score_lte, score_gt, score_gte, status (current status) and top
+    (only the N best-ranked applicants). Ownership is checked once per job, and
+    the change is applied with set-based UPDATEs, however many rows match.
+    """
+    claims = get_jwt()
+    if claims.get('role') != 'recruiter':
+        return jsonify({'error': 'Access denied. Recruiters only.'}), 403
+
+    data = request.get_json(silent=True) or {}
+    new_status = data.get('status')
+    if new_status not in counters.APPLICATION_STATUSES:
+        return jsonify({'error': f"Status must be one of: {', '.join(counters.APPLICATION_STATUSES)}"}), 400
+    current_user_id = get_jwt_identity()
+
+    ids = data.get('application_ids')
+    not_found = []
+    if ids is not None:
+        if not isinstance(ids, list) or not all(isinstance(i, int) and not isinstance(i, bool) for i in ids):
+            return jsonify({'error': 'application_ids must be a list of integers'}), 400
+        if len(ids) > BULK_MAX_IDS:
+            return jsonify({'error': f'At most {BULK_MAX_IDS} applications can be updated per request'}), 400
+        ids = list(dict.fromkeys(ids))
+        rows = db.session.query(Application.id, Job.id, Job.recruiter_id).join(
+            Job, Job.id == Application.job_id
+        ).filter(Application.id.in_(ids)).all() if ids else []
+        if any(str(recruiter_id) != str(current_user_id) for _, _, recruiter_id in rows):
+            return jsonify({'error': 'Access denied. You do not own the jobs of all these applications.'}), 403
+        found = {application_id for application_id, _, _ in rows}
+        not_found = [i for i in ids if i not in found]
+        conditions = [Application.id.in_(sorted(found))]
+    elif data.get('job_id') is not None:
+        job = Job.query.get_or_404(data.get('job_id'))
+        if str(job.recruiter_id) != str(current_user_id):
+            return jsonify({'error': 'Access denied. You do not own this job.'}), 403
+        conditions = [Application.job_id == job.id]
+        predicate = data.get('filter') or {}
+        if not isinstance(predicate, dict):
+            return jsonify({'error': 'filter must be an object'}), 400
+        for key, value in predicate.items():
+            if key in SCORE_FILTERS:
+                if not _is_number(value):
+                    return jsonify({'error': f'{key} must be a number'}), 400
+                conditions.append(SCORE_FILTERS[key](value))
+            elif key == 'status':
+                if value not in counters.APPLICATION_STATUSES:
+                    return jsonify({'error': f"filter.status must be one of: {', '.join(counters.APPLICATION_STATUSES)}"}), 400
+                conditions.append(counters.has_status(value))
+            elif key == 'top':
+                if not isinstance(value, int) or isinstance(value, bool) or value < 1:
+                    return jsonify({'error': 'top must be a positive integer'}), 400
+                best = db.session.query(Application.id).filter(Application.job_id == job.id).order_by(
+                    application_rank.desc(), Application.id.desc()
+                ).limit(value)
+                conditions.append(Application.id.in_(best.scalar_subquery()))
+            else:
+                return jsonify({'error': f"Unknown filter '{key}'"}), 400
+    else:
+        return jsonify({'error': 'Either application_ids or job_id is required'}), 400
+
+    unchanged = db.session.query(func.count(Application.id)).filter(
+        *conditions, counters.has_status(new_status)
+    ).scalar()
+    changed = counters.bulk_set_status(conditions, new_status)
+    db.session.commit()
+
+    updated = sum(changed.values())
+    return jsonify({
+        'status': new_status,
+        'matched': updated + unchanged,
+        'updated': updated,
+        'unchanged': unchanged,
+        'updated_by_job': {str(job_id): count for job_id, count in changed.items()},
+        'not_found': not_found
+    }), 200
+
+@bp.route('/<int:application_id>', methods=['DELETE'])
+@jwt_required()
+def withdraw_application(application_id):
+    claims = get_jwt()
+    if claims.get('role') != 'student':
+        return jsonify({'error': 'Access denied. Students only.'}), 403
+
+    application = Application.query.get_or_404(application_id)
+    if str(application.student_id) != str(get_jwt_identity()):
+        return jsonify({'error': 'Access denied. This is not your application.'}), 403
+
+    counters.adjust(application.job_id, application.status, -1)
+    resume_index.delete(resume_doc_id('application', application.id))
+    db.session.delete(application)
+    db.session.flush()
+    storage.release(application.file_sha256)
+    db.session.commit()
+    return jsonify({'message': 'Application withdrawn successfully'}), 200
+
@@ -15,3 +15,32 @@ class Config:
     MAIL_USE_TLS = os.environ.get('MAIL_USE_TLS') == 'True'
     MAIL_USERNAME = os.environ.get('MAIL_USERNAME')
     MAIL_PASSWORD = os.environ.get('MAIL_PASSWORD')
+
+    # Background analysis workers
+    ANALYSIS_WORKERS = int(os.environ.get('ANALYSIS_WORKERS') or 2)
+    ANALYSIS_LEASE_SECONDS = int(os.environ.get('ANALYSIS_LEASE_SECONDS') or 300)
+    ANALYSIS_MAX_ATTEMPTS = int(os.environ.get('ANALYSIS_MAX_ATTEMPTS') or 3)
+    ANALYSIS_POLL_INTERVAL = float(os.environ.get('ANALYSIS_POLL_INTERVAL') or 1.0)
+    # Other applicants' resumes the local scorer reads for IDF when scoring a single application
+    LOCAL_SCORER_CORPUS_SIZE = int(os.environ.get('LOCAL_SCORER_CORPUS_SIZE') or 200)
+
+    # Listing endpoints return pages of this size; clients may ask for up to MAX_PAGE_SIZE with ?limit=
+    PAGE_SIZE = int(os.environ.get('PAGE_SIZE') or 50)
+    MAX_PAGE_SIZE = int(os.environ.get('MAX_PAGE_SIZE') or 200)
+    # Exports stream rows from a server-side cursor, this many at a time
+    EXPORT_BATCH_SIZE = int(os.environ.get('EXPORT_BATCH_SIZE') or 1000)
+    # Bulk job import: jobs per request, and per INSERT / transaction
+    IMPORT_MAX_JOBS = int(os.environ.get('IMPORT_MAX_JOBS') or 10000)
+    IMPORT_CHUNK_SIZE = int(os.environ.get('IMPORT_CHUNK_SIZE') or 500)
+
+    # Cache of job listing/detail responses: 'sqlite' (shared by every worker process
+    # on the host), 'memory' (only correct with a single server process) or 'none'.
+    # Entries older than RESPONSE_CACHE_TTL seconds are never served.
+    RESPONSE_CACHE = os.environ.get('RESPONSE_CACHE') or 'sqlite'
+    RESPONSE_CACHE_SIZE = int(os.environ.get('RESPONSE_CACHE_SIZE') or 1000)
+    RESPONSE_CACHE_TTL = int(os.environ.get('RESPONSE_CACHE_TTL') or 300)
+    RESPONSE_CACHE_PATH = os.environ.get('RESPONSE_CACHE_PATH')
+
+    # JSON and text responses of at least COMPRESS_MIN_SIZE bytes are gzipped for clients that accept it
+    COMPRESS_MIN_SIZE = int(os.environ.get('COMPRESS_MIN_SIZE') or 1024)
+    COMPRESS_LEVEL = int(os.environ.get('COMPRESS_LEVEL') or 6)
@@ -0,0 +1,69 @@
+from flask import request
+
+
+class InvalidFields(ValueError):
+    pass
+
+
+class Field:
+    """
+    One field of a listing: how it is rendered from a row, the model columns it
+    reads, and any loader options it needs (e.g. a joinedload for a related name).
+    options is a function returning them, since relationships created by backrefs
+    only exist once the mappers are configured.
+    """
+
+    def __init__(self, render, *columns, options=None):
+        self.render = render
+        self.columns = columns
+        self.options = options
+
+
+class FieldSet:
+    """
+    The fields a listing endpoint can return. Clients pick a subset with
+    ?fields=title,company (JSON:API style sparse fieldsets); the query then loads
+    only the columns those fields read, so large text columns the client did not
+    ask for never leave the database. 'id' is always included.
+    """
+
+    def __init__(self, fields):
+        self.fields = fields
+
+    def requested(self):
+        """The ?fields= names in the order given, or every field when absent. Raises InvalidFields."""
+        raw = request.args.get('fields')
+        if not raw:
+            return list(self.fields)
+        names = ['id']
+        for name in raw.split(','):
+            name = name.strip()
+            if not name or name in names:
+                continue
+            if name not in self.fields:
+                raise InvalidFields(f"Unknown field '{name}'. Available fields: {', '.join(self.fields)}")
+            names.append(name)
+        return names
+
+    def columns(self, names, *extra):
+        """Columns to load for the named fields, plus extra ones the query needs (e.g. sort keys)."""
+        columns = list(extra)
+        for name in names:
+            for column in self.fields[name].columns:
+                # Identity, not ==, which builds a SQL expression for columns
+                if not any(column is c for c in columns):
+                    columns.append(column)
+        return columns
+
+    def options(self, names):
+        """Loader options of the named fields, each function called once."""
+        options, seen = [], []
+        for name in names:
+            make_options = self.fields[name].options
+            if make_options and make_options not in seen:
+                seen.append(make_options)
+                options.extend(make_options())
+        return options
+
+    def render(self, row, names):
+        return {name: self.fields[name].render(row) for name in names}
@@ -0,0 +1,36 @@
+import click
+from app import db
+from app.models import Job
+from app.ai_engine.job_digest import DIGEST_VERSION, loads
+from app.search import index_job
+from .counters import recompute
+from . import bp
+
+@bp.cli.command('rebuild-digests')
+@click.option('--all', 'rebuild_all', is_flag=True, help='Rebuild every digest, not only missing or outdated ones.')
+def rebuild_digests(rebuild_all):
+    """Builds job digests for jobs saved before digests existed or with an older digest version."""
+    rebuilt = 0
+    for job in Job.query.all():
+        digest = loads(job.digest)
+        if rebuild_all or not digest or digest.get('version') != DIGEST_VERSION:
+            job.refresh_digest()
+            rebuilt += 1
+    db.session.commit()
+    click.echo(f'Rebuilt {rebuilt} job digests.')
+
+@bp.cli.command('reindex')
+def reindex():
+    """Rebuilds the job search index from the job table."""
+    jobs = Job.query.all()
+    for job in jobs:
+        index_job(job)
+    db.session.commit()
+    click.echo(f'Indexed {sum(1 for job in jobs if job.status == "active")} open jobs.')
+
+@bp.cli.command('repair-counters')
+def repair_counters():
+    """Recomputes every job's applicant counters from the application table."""
+    repaired = recompute()
+    db.session.commit()
+    click.echo(f'Repaired counters on {repaired} jobs.')
@@ -0,0 +1,114 @@
+from sqlalchemy import case, func, or_, update
+from app import db
+from app.models import Job, Application
+
+APPLICATION_STATUSES = ('pending', 'shortlisted', 'rejected', 'reviewed')
+
+# Application status -> Job counter column
+STATUS_COUNTERS = {status: getattr(Job, f'{status}_count') for status in APPLICATION_STATUSES}
+
+
+def adjust(job_id, status, delta):
+    """
+    Adds delta to a job's applicant total and to the counter of the given status, as a
+    single UPDATE relative to the stored values, so concurrent requests cannot lose counts.
+    Runs in the caller's transaction.
+    """
+    values = {Job.applicants_count: Job.applicants_count + delta}
+    counter = STATUS_COUNTERS.get(status or 'pending')
+    if counter is not None:
+        values[counter] = counter + delta
+    # Cached job listings read the counters fresh, see jobs.routes._refresh_counters
+    Job.query.filter_by(id=job_id).update(values, synchronize_session=False)
+
+
+def move(job_id, old_status, new_status, count=1):
+    """Moves count applications of a job from one status counter to another."""
+    old_counter = STATUS_COUNTERS.get(old_status or 'pending')
+    new_counter = STATUS_COUNTERS.get(new_status)
+    if old_counter is new_counter:
+        return
+    values = {}
+    if old_counter is not None:
+        values[old_counter] = old_counter - count
+    if new_counter is not None:
+        values[new_counter] = new_counter + count
+    Job.query.filter_by(id=job_id).update(values, synchronize_session=False)
+
+
+def set_status(application, new_status):
+    """
+    Changes an application's status and moves the job counters with it. The status is
+    only changed if it still holds the value read earlier, so two concurrent updates of
+    the same application move the counters once. Returns False if another request won.
+    """
+    old_status = application.status
+    if old_status == new_status:
+        return True
+    changed = Application.query.filter(
+        Application.id == application.id,
+        Application.status.is_(None) if old_status is None else Application.status == old_status
+    ).update({Application.status: new_status}, synchronize_session=False)
+    if not changed:
+        return False
+    move(application.job_id, old_status, new_status)
+    application.status = new_status
+    return True
+
+
+def has_status(status):
+    """Filter for applications in the given status."""
+    # Applications saved before statuses were enforced may have none, which means pending
+    if status == 'pending':
+        return or_(Application.status == 'pending', Application.status.is_(None))
+    return Application.status == status
+
+
+def bulk_set_status(conditions, new_status):
+    """
+    Moves every application matching conditions to new_status. One UPDATE per current
+    status (at most three), each guarded by that status like set_status, so the
+    counters move by exactly the rows each statement changed even when other requests
+    update the same applications. Returns {job_id: applications changed}.
+    """
+    changed = {}
+    for old_status in APPLICATION_STATUSES:
+        if old_status == new_status:
+            continue
+        job_ids = db.session.scalars(
+            update(Application).where(*conditions, has_status(old_status))
+            .values(status=new_status).returning(Application.job_id)
+            .execution_options(synchronize_session=False)
+        ).all()
+        per_job = {}
+        for job_id in job_ids:
+            per_job[job_id] = per_job.get(job_id, 0) + 1
+        for job_id, count in per_job.items():
+            move(job_id, old_status, new_status, count=count)
+            changed[job_id] = changed.get(job_id, 0) + count
+    return changed
+
+
+def recompute(job_ids=None):
+    """Recounts applicants per job from the application table. Returns the number of jobs repaired."""
+    status = func.coalesce(Application.status, 'pending')
+    columns = [func.count(Application.id)] + [
+        func.coalesce(func.sum(case((status == s, 1), else_=0)), 0) for s in APPLICATION_STATUSES
+    ]
+    counts_query = db.session.query(Application.job_id, *columns).group_by(Application.job_id)
+    jobs_query = Job.query
+    if job_ids is not None:
+        counts_query = counts_query.filter(Application.job_id.in_(job_ids))
+        jobs_query = jobs_query.filter(Job.id.in_(job_ids))
+    counts = {row[0]: row[1:] for row in counts_query.all()}
+
+    repaired = 0
+    for job in jobs_query.all():
+        expected = counts.get(job.id, (0,) * (len(APPLICATION_STATUSES) + 1))
+        current = (job.applicants_count,) + tuple(getattr(job, f'{s}_count') for s in APPLICATION_STATUSES)
+        if tuple(expected) != current:
+            job.applicants_count = expected[0]
+            for s, value in zip(APPLICATION_STATUSES, expected[1:]):
+                setattr(job, f'{s}_count', value)
+            repaired += 1
+    return repaired
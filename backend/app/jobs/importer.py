@@ -0,0 +1,151 @@
+import json
+from types import SimpleNamespace
+from datetime import datetime
+from sqlalchemy import insert
+from sqlalchemy.exc import SQLAlchemyError
+from app import db, response_cache
+from app.models import Job
+from app.search import job_index
+from app.ai_engine import job_digest
+
+# Request field -> (Job column, maximum length). Lengths are checked up front so one
+# oversized value cannot fail the multi-row INSERT of its whole chunk.
+TEXT_FIELDS = {
+    'title': ('title', 100),
+    'description': ('description', None),
+    'requirements': ('requirements', None),
+    'company': ('company', 100),
+    'location': ('location', 100),
+    'type': ('job_type', 50),
+    'experience': ('experience', 50),
+    'salary': ('salary', 100),
+    'status': ('status', 20),
+}
+
+
+class InvalidImport(ValueError):
+    """The request body as a whole cannot be read as jobs."""
+
+
+def parse_job(data):
+    """
+    Validates one job as create_job accepts it and returns the Job column values.
+    Raises ValueError with a message for the caller's error report.
+    """
+    if not isinstance(data, dict):
+        raise ValueError('Each job must be a JSON object')
+    if not data.get('title') or not data.get('description'):
+        raise ValueError('Title and description are required')
+
+    # Every row carries the same keys, so the chunk's INSERT is a single executemany
+    values = {column: None for column, _ in TEXT_FIELDS.values()}
+    for field, (column, max_length) in TEXT_FIELDS.items():
+        value = data.get(field)
+        if value is None:
+            continue
+        if not isinstance(value, str):
+            raise ValueError(f"'{field}' must be a string")
+        if max_length and len(value) > max_length:
+            raise ValueError(f"'{field}' is longer than {max_length} characters")
+        values[column] = value
+    values['status'] = values['status'] or 'active'
+
+    skills = data.get('skills')
+    if isinstance(skills, list):
+        if not all(isinstance(skill, str) for skill in skills):
+            raise ValueError("'skills' must be a list of strings")
+        skills = ','.join(skills)
+    elif skills is not None and not isinstance(skills, str):
+        raise ValueError("'skills' must be a list or a comma-separated string")
+    values['skills'] = skills
+
+    deadline = data.get('deadline')
+    values['deadline'] = None
+    if deadline:
+        try:
+            values['deadline'] = datetime.fromisoformat(str(deadline).replace('Z', '+00:00'))
+        except ValueError:
+            raise ValueError(f"Invalid deadline '{deadline}', expected an ISO 8601 date")
+    return values
+
+
+def read_json_array(body):
+    """Rows of a JSON array body, as (row number, job data or ValueError) pairs."""
+    try:
+        data = json.loads(body)
+    except ValueError as e:
+        raise InvalidImport(f'Invalid JSON: {e}')
+    if not isinstance(data, list):
+        raise InvalidImport('Expected a JSON array of jobs')
+    return list(enumerate(data, 1))
+
+
+def read_ndjson(stream):
+    """Rows of an NDJSON stream, one job per line; blank lines are skipped, bad lines reported."""
+    rows = []
+    for number, line in enumerate(stream, 1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            rows.append((number, json.loads(line)))
+        except ValueError as e:
+            rows.append((number, ValueError(f'Invalid JSON: {e}')))
+    return rows
+
+
+def import_jobs(rows, recruiter_id, chunk_size=500):
+    """
+    Validates every row in one pass, then inserts the valid ones chunk_size at a
+    time: one multi-row INSERT for the jobs and one executemany for their search
+    index entries, committed per chunk. If a chunk fails, its rows are retried
+    one by one so only the offending rows are reported.
+
+    Returns (job_ids, errors) with errors as [{'row': n, 'error': message}].
+    """
+    valid, errors = [], []
+    for number, data in rows:
+        try:
+            if isinstance(data, Exception):
+                raise data
+            values = parse_job(data)
+        except ValueError as e:
+            errors.append({'row': number, 'error': str(e)})
+            continue
+        values['recruiter_id'] = recruiter_id
+        # Same digest as Job.refresh_digest, without building ORM instances
+        values['digest'] = job_digest.dumps(job_digest.build_digest(SimpleNamespace(**values)))
+        valid.append((number, values))
+
+    job_ids = []
+    for start in range(0, len(valid), chunk_size):
+        chunk = valid[start:start + chunk_size]
+        try:
+            job_ids.extend(_insert_chunk([values for _, values in chunk]))
+        except SQLAlchemyError:
+            db.session.rollback()
+            for number, values in chunk:
+                try:
+                    job_ids.extend(_insert_chunk([values]))
+                except SQLAlchemyError as e:
+                    db.session.rollback()
+                    errors.append({'row': number, 'error': f"Could not be saved: {getattr(e, 'orig', None) or e}"})
+
+    errors.sort(key=lambda error: error['row'])
+    return job_ids, errors
+
+
+def _insert_chunk(chunk):
+    # The inserted rows come back with their indexed columns, so ids never have to be
+    # matched to parameters by position. Asking for that order instead
+    # (sort_by_parameter_order) makes SQLite insert one row per statement.
+    indexed = [getattr(Job, column) for column in job_index.columns]
+    rows = db.session.execute(insert(Job).returning(Job.id, Job.status, *indexed), chunk).all()
+    # Only postings students can apply to are searchable, as in index_job
+    job_index.upsert_many([
+        (row.id, {column: getattr(row, column) for column in job_index.columns})
+        for row in rows if row.status == 'active'
+    ])
+    response_cache.invalidate('jobs')
+    db.session.commit()
+    return sorted(row.id for row in rows)
@@ -1,7 +1,18 @@
-from flask import jsonify, request
+import io
+import csv
+from collections import Counter
+from flask import jsonify, request, current_app, Response, stream_with_context
 from flask_jwt_extended import jwt_required, get_jwt_identity, get_jwt
 from app import db
-from app.models import Job, User, Application
+from app.models import Job, User, Application, AnalysisTask, application_rank
+from app.analysis.tasks import enqueue
+from app.search import job_index, index_job, unindex_job, resume_index, resume_doc_id
+from app.pagination import paginate
+from app.fields import Field, FieldSet
+from app import response_cache, storage
+from app.jobs.counters import APPLICATION_STATUSES
+from app.jobs.importer import InvalidImport, read_json_array, read_ndjson, import_jobs
+from sqlalchemy.orm import joinedload, load_only
 from datetime import datetime
 from . import bp
 
@@ -52,14 +63,103 @@ def create_job():
         deadline=deadline,
         recruiter_id=recruiter_id
     )
+    job.refresh_digest()
 
     db.session.add(job)
+    db.session.flush()
+    # Search index row commits together with the job
+    index_job(job)
+    response_cache.invalidate('jobs')
     db.session.commit()
 
     return jsonify({'message': 'Job posted successfully', 'job_id': job.id}), 201
 
+JOB_FIELDS = FieldSet({
+    'id': Field(lambda job: job.id, Job.id),
+    'title': Field(lambda job: job.title, Job.title),
+    'description': Field(lambda job: job.description, Job.description),
+    'requirements': Field(lambda job: job.requirements, Job.requirements),
+    'company': Field(lambda job: job.company, Job.company),
+    'location': Field(lambda job: job.location, Job.location),
+    'type': Field(lambda job: job.job_type, Job.job_type),
+    'experience': Field(lambda job: job.experience, Job.experience),
+    'salary': Field(lambda job: job.salary, Job.salary),
+    'skills': Field(lambda job: job.skills.split(',') if job.skills else [], Job.skills),
+    'status': Field(lambda job: job.status, Job.status),
+    'deadline': Field(lambda job: job.deadline.isoformat() if job.deadline else None, Job.deadline),
+    'created_at': Field(lambda job: job.created_at.isoformat(), Job.created_at),
+    'recruiter_id': Field(lambda job: job.recruiter_id, Job.recruiter_id),
+    'applicants_count': Field(lambda job: job.applicants_count, Job.applicants_count),
+    'status_counts': Field(
+        lambda job: {status: getattr(job, f'{status}_count') for status in APPLICATION_STATUSES},
+        *[getattr(Job, f'{status}_count') for status in APPLICATION_STATUSES]
+    ),
+})
+
+@bp.route('/import', methods=['POST'])
+@jwt_required()
+def bulk_import_jobs():
+    """
+    Creates many jobs at once from a JSON array, or from NDJSON (one job per line)
+    sent as application/x-ndjson. Each job takes the same fields as create_job.
+    Invalid rows are reported by row (array index or line number, from 1) and
+    skipped; the valid ones are still created.
+    """
+    claims = get_jwt()
+    if claims.get('role') != 'recruiter':
+        return jsonify({'error': 'Access denied. Recruiters only.'}), 403
+
+    try:
+        if request.mimetype in ('application/x-ndjson', 'application/jsonl'):
+            rows = read_ndjson(request.stream)
+        else:
+            rows = read_json_array(request.get_data())
+    except InvalidImport as e:
+        return jsonify({'error': str(e)}), 400
+    max_jobs = current_app.config['IMPORT_MAX_JOBS']
+    if len(rows) > max_jobs:
+        return jsonify({'error': f'At most {max_jobs} jobs can be imported per request'}), 413
+
+    job_ids, errors = import_jobs(rows, int(get_jwt_identity()), chunk_size=current_app.config['IMPORT_CHUNK_SIZE'])
+    return jsonify({
+        'created': len(job_ids),
+        'failed': len(errors),
+        'job_ids': job_ids,
+        'errors': errors
+    }), 201 if job_ids or not errors else 400
+
+def _listing_audience():
+    # Recruiters see their own postings, everyone else the same full list
+    claims = get_jwt()
+    if claims.get('role') == 'recruiter':
+        return ['recruiter', get_jwt_identity()]
+    return [claims.get('role')]
+
+# Fields that change with every application and status update
+COUNTER_FIELDS = ('applicants_count', 'status_counts')
+
+def _refresh_counters(rows):
+    """
+    Brings the counters in a (possibly cached) listing page up to date, so applying
+    or reviewing does not have to invalidate every cached listing. Returns the counts
+    for the ETag.
+    """
+    fields = [name for name in COUNTER_FIELDS if rows and name in rows[0]]
+    if not fields:
+        return None
+    columns = JOB_FIELDS.columns(fields)
+    jobs = {job.id: job for job in db.session.query(Job.id, *columns).filter(Job.id.in_([row['id'] for row in rows]))}
+    state = []
+    for row in rows:
+        job = jobs.get(row['id'])
+        if job is not None:
+            row.update(JOB_FIELDS.render(job, fields))
+            state.append([job.id] + [getattr(job, column.key) for column in columns])
+    return state
+
 @bp.route('/', methods=['GET'])
 @jwt_required()
+@response_cache.cached('jobs', vary=_listing_audience, refresh=_refresh_counters)
 def get_jobs():
     # If recruiter, return their jobs. If student, return all jobs (or search).
     # For now, let's just return all jobs for simplicity, or filter by recruiter_id if provided.
@@ -69,17 +169,42 @@ def get_jobs():
     current_user_id = get_jwt_identity()
 
     if role == 'recruiter':
-        jobs = Job.query.filter_by(recruiter_id=current_user_id).order_by(Job.created_at.desc()).all()
+        query = Job.query.filter_by(recruiter_id=current_user_id)
     else:
-        jobs = Job.query.order_by(Job.created_at.desc()).all()
+        query = Job.query
+    # ?fields= narrows the SELECT; the sort keys are always needed for the cursors
+    fields = JOB_FIELDS.requested()
+    query = query.options(load_only(*JOB_FIELDS.columns(fields, Job.created_at, Job.id)))
+    jobs, headers = paginate(query, [Job.created_at, Job.id])
 
-    result = []
-    for job in jobs:
-        result.append({
+    result = [JOB_FIELDS.render(job, fields) for job in jobs]
+    return jsonify(result), 200, headers
+
+@bp.route('/search', methods=['GET'])
+@jwt_required()
+def search_jobs():
+    """
+    Ranked full-text search over open jobs (title, skills, requirements, company,
+    description, location). Every word also matches as a prefix, so results update
+    while the user is typing. Paginated with ?page= and ?per_page= (max 100).
+    """
+    query = (request.args.get('q') or '').strip()
+    if not query:
+        return jsonify({'error': 'Search query (q) is required'}), 400
+    page = max(request.args.get('page', 1, type=int), 1)
+    per_page = min(max(request.args.get('per_page', 20, type=int), 1), 100)
+
+    total, hits = job_index.search(query, limit=per_page, offset=(page - 1) * per_page, prefix=True)
+    jobs = {job.id: job for job in Job.query.filter(Job.id.in_([doc_id for doc_id, _, _ in hits])).all()} if hits else {}
+
+    results = []
+    for doc_id, score, snippet in hits:
+        job = jobs.get(doc_id)
+        if job is None:
+            continue
+        results.append({
             'id': job.id,
             'title': job.title,
-            'description': job.description,
-            'requirements': job.requirements,
             'company': job.company,
             'location': job.location,
             'type': job.job_type,
@@ -89,14 +214,21 @@ def get_jobs():
             'status': job.status,
             'deadline': job.deadline.isoformat() if job.deadline else None,
             'created_at': job.created_at.isoformat(),
-            'recruiter_id': job.recruiter_id,
-            'applicants_count': job.applications.count()
+            'score': score,
+            'snippet': snippet
         })
 
-    return jsonify(result), 200
+    return jsonify({
+        'query': query,
+        'total': total,
+        'page': page,
+        'per_page': per_page,
+        'results': results
+    }), 200
 
 @bp.route('/<int:job_id>', methods=['GET'])
 @jwt_required()
+@response_cache.cached('jobs')
 def get_job(job_id):
     job = Job.query.get_or_404(job_id)
     return jsonify({
@@ -110,6 +242,22 @@ def get_job(job_id):
         'status': job.status
     }), 200
 
+def _join_student():
+    # Students are joined into the same query instead of lazy-loaded per row
+    return [joinedload(Application.student).load_only(User.full_name, User.email)]
+
+APPLICANT_FIELDS = FieldSet({
+    'id': Field(lambda app: app.id, Application.id),
+    'student_id': Field(lambda app: app.student_id, Application.student_id),
+    'name': Field(lambda app: app.student.full_name or "Unknown", Application.student_id, options=_join_student),
+    'email': Field(lambda app: app.student.email, Application.student_id, options=_join_student),
+    'resume_path': Field(lambda app: app.resume_path, Application.resume_path),
+    'score': Field(lambda app: app.score, Application.score),
+    'analysis_summary': Field(lambda app: app.analysis_summary, Application.analysis_summary),
+    'skills': Field(lambda app: app.skills.split(', ') if app.skills else [], Application.skills),
+    'created_at': Field(lambda app: app.created_at.isoformat(), Application.created_at),
+})
+
 @bp.route('/<int:job_id>/applications', methods=['GET'])
 @jwt_required()
 def get_job_applications(job_id):
@@ -125,20 +273,102 @@ def get_job_applications(job_id):
     if str(job.recruiter_id) != str(current_user_id):
          return jsonify({'error': 'Access denied. You do not own this job.'}), 403
 
-    applications = job.applications.order_by(Application.score.desc()).all()
-    result = []
-    for app in applications:
-        result.append({
-            'id': app.id,
-            'student_id': app.student_id,
-            'name': app.student.full_name or "Unknown",
-            'email': app.student.email,
-            'resume_path': app.resume_path,
-            'score': app.score,
-            'analysis_summary': app.analysis_summary,
-            'created_at': app.created_at.isoformat()
-        })
-    return jsonify(result), 200
+    fields = APPLICANT_FIELDS.requested()
+    query = Application.query.options(
+        load_only(*APPLICANT_FIELDS.columns(fields, Application.score, Application.id)),
+        *APPLICANT_FIELDS.options(fields)
+    ).filter_by(job_id=job.id)
+    applications, headers = paginate(
+        query, [application_rank, Application.id],
+        row_key=lambda app: [app.score if app.score is not None else -1.0, app.id]
+    )
+    result = [APPLICANT_FIELDS.render(app, fields) for app in applications]
+    return jsonify(result), 200, headers
+
+EXPORT_COLUMNS = ('id', 'name', 'email', 'score', 'status', 'skills', 'summary', 'applied_at')
+EXPORT_FORMATS = {
+    'csv': ('text/csv', 'csv'),
+    'ndjson': ('application/x-ndjson', 'ndjson'),
+}
+
+def _csv_safe(value):
+    # Spreadsheets run cells starting with these as formulas; resume text is untrusted
+    if isinstance(value, str) and value[:1] in ('=', '+', '-', '@'):
+        return "'" + value
+    return value
+
+@bp.route('/<int:job_id>/applications/export', methods=['GET'])
+@jwt_required()
+def export_job_applications(job_id):
+    """
+    Streams every applicant of a job, ranked like get_job_applications, as CSV
+    (default) or NDJSON (?format=ndjson). Rows are read from a server-side cursor
+    EXPORT_BATCH_SIZE at a time and written out batch by batch, so memory use does
+    not grow with the number of applicants.
+    """
+    claims = get_jwt()
+    if claims.get('role') != 'recruiter':
+        return jsonify({'error': 'Access denied. Recruiters only.'}), 403
+
+    job = Job.query.get_or_404(job_id)
+    if str(job.recruiter_id) != str(get_jwt_identity()):
+        return jsonify({'error': 'Access denied. You do not own this job.'}), 403
+
+    export_format = request.args.get('format', 'csv')
+    if export_format not in EXPORT_FORMATS:
+        return jsonify({'error': f"Format must be one of: {', '.join(EXPORT_FORMATS)}"}), 400
+    mimetype, extension = EXPORT_FORMATS[export_format]
+
+    batch_size = current_app.config['EXPORT_BATCH_SIZE']
+    # Plain column tuples rather than ORM objects, so nothing accumulates in the session
+    query = db.session.query(
+        Application.id, User.full_name, User.email, Application.score, Application.status,
+        Application.skills, Application.analysis_summary, Application.created_at
+    ).outerjoin(User, User.id == Application.student_id).filter(
+        Application.job_id == job.id
+    ).order_by(application_rank.desc(), Application.id.desc()).execution_options(yield_per=batch_size)
+
+    def rows():
+        for row in query:
+            yield {
+                'id': row.id,
+                'name': row.full_name,
+                'email': row.email,
+                'score': row.score,
+                'status': row.status or 'pending',
+                'skills': [skill for skill in (row.skills or '').split(', ') if skill],
+                'summary': row.analysis_summary,
+                'applied_at': row.created_at.isoformat() if row.created_at else None
+            }
+
+    def generate_csv():
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(EXPORT_COLUMNS)
+        for count, row in enumerate(rows(), 1):
+            row['skills'] = ', '.join(row['skills'])
+            writer.writerow([_csv_safe(row[column]) for column in EXPORT_COLUMNS])
+            if count % batch_size == 0:
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+        yield buffer.getvalue()
+
+    def generate_ndjson():
+        dumps = current_app.json.dumps
+        lines = []
+        for row in rows():
+            lines.append(dumps(row))
+            if len(lines) >= batch_size:
+                yield '\n'.join(lines) + '\n'
+                lines = []
+        if lines:
+            yield '\n'.join(lines) + '\n'
+
+    generate = generate_csv if export_format == 'csv' else generate_ndjson
+    return Response(stream_with_context(generate()), mimetype=mimetype, headers={
+        'Content-Disposition': f'attachment; filename="job-{job.id}-applicants.{extension}"'
+    })
 
 @bp.route('/<int:job_id>', methods=['DELETE'])
 @jwt_required()
@@ -153,7 +383,18 @@ def delete_job(job_id):
     if str(job.recruiter_id) != str(current_user_id):
         return jsonify({'error': 'Access denied. You do not own this job.'}), 403
 
+    # Applications (and with them the job's counters) go with the job
+    applications = Application.query.with_entities(Application.id, Application.file_sha256).filter_by(job_id=job.id).all()
+    for application in applications:
+        resume_index.delete(resume_doc_id('application', application.id))
+    Application.query.filter_by(job_id=job.id).delete(synchronize_session=False)
+    # Then their references to the stored resume files, one release per file
+    file_refs = Counter(application.file_sha256 for application in applications if application.file_sha256)
+    for file_sha256, count in file_refs.items():
+        storage.release(file_sha256, count)
+    unindex_job(job.id)
     db.session.delete(job)
+    response_cache.invalidate('jobs')
     db.session.commit()
     return jsonify({'message': 'Job deleted successfully'}), 200
 
@@ -182,6 +423,34 @@ def update_job(job_id):
     if 'salary' in data: job.salary = data['salary']
     if 'skills' in data: job.skills = ','.join(data['skills']) if isinstance(data['skills'], list) else data['skills']
     if 'status' in data: job.status = data['status']
+    job.refresh_digest()
+    index_job(job)
+    response_cache.invalidate('jobs')
     
     db.session.commit()
     return jsonify({'message': 'Job updated successfully'}), 200
+
+@bp.route('/<int:job_id>/rescore', methods=['POST'])
+@jwt_required()
+def rescore_job(job_id):
+    claims = get_jwt()
+    if claims.get('role') != 'recruiter':
+        return jsonify({'error': 'Access denied. Recruiters only.'}), 403
+
+    job = Job.query.get_or_404(job_id)
+    current_user_id = get_jwt_identity()
+
+    if str(job.recruiter_id) != str(current_user_id):
+        return jsonify({'error': 'Access denied. You do not own this job.'}), 403
+
+    # Reuse a rescore that is still waiting or running instead of queueing a duplicate
+    task = AnalysisTask.query.filter(
+        AnalysisTask.kind == 'job_rescore',
+        AnalysisTask.target_id == job.id,
+        AnalysisTask.status.in_(['queued', 'running'])
+    ).first()
+    if not task:
+        task = enqueue('job_rescore', job.id)
+        db.session.commit()
+
+    return jsonify({'message': 'Rescoring queued', 'task_id': task.id, 'status': task.status}), 202
@@ -1,6 +1,7 @@
 from . import db
 from datetime import datetime
 from werkzeug.security import generate_password_hash, check_password_hash
+from .ai_engine import job_digest
 
 class User(db.Model):
     id = db.Column(db.Integer, primary_key=True)
@@ -19,9 +20,10 @@ class User(db.Model):
     skills = db.Column(db.Text) # JSON string or comma-separated
     education = db.Column(db.String(200))
     
-    # Relationships
-    jobs = db.relationship('Job', backref='recruiter', lazy='dynamic')
-    applications = db.relationship('Application', backref='student', lazy='dynamic')
+    # Relationships. Plain collections so listings can load them up front with
+    # joinedload / selectinload; dynamic relationships cannot be eager loaded.
+    jobs = db.relationship('Job', backref='recruiter', lazy='select')
+    applications = db.relationship('Application', backref='student', lazy='select')
 
     def set_password(self, password):
         self.password_hash = generate_password_hash(password)
@@ -30,6 +32,12 @@ class User(db.Model):
         return check_password_hash(self.password_hash, password)
 
 class Job(db.Model):
+    __table_args__ = (
+        # A recruiter's postings, newest first (and the keyset cursor on created_at, id)
+        db.Index('ix_job_recruiter_id_created_at', 'recruiter_id', 'created_at', 'id'),
+        db.Index('ix_job_created_at', 'created_at', 'id'),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     title = db.Column(db.String(100), nullable=False)
     description = db.Column(db.Text, nullable=False)
@@ -43,24 +51,71 @@ class Job(db.Model):
     salary = db.Column(db.String(100))
     skills = db.Column(db.Text) # JSON string or comma-separated
     status = db.Column(db.String(20), default='active') # active, draft, closed
+    digest = db.Column(db.Text) # JSON, see ai_engine.job_digest.build_digest
+
+    # Denormalized applicant counts, maintained by app.jobs.counters
+    applicants_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    pending_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    shortlisted_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    rejected_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    reviewed_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
     
     deadline = db.Column(db.DateTime)
     recruiter_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     
-    applications = db.relationship('Application', backref='job', lazy='dynamic')
+    applications = db.relationship('Application', backref='job', lazy='select')
+
+    def refresh_digest(self):
+        """Rebuilds the stored digest; call whenever the posting's text fields change."""
+        self.digest = job_digest.dumps(job_digest.build_digest(self))
+
+    @property
+    def match_text(self):
+        """
+        Everything resumes are scored against. Uses the precomputed digest; jobs saved
+        before digests existed fall back to the description plus requirements and skills.
+        """
+        digest = job_digest.loads(self.digest)
+        if digest:
+            return job_digest.render_digest(digest)
+        parts = [self.description, self.requirements]
+        if self.skills:
+            parts.append(f"Skills: {self.skills}")
+        return '\n'.join(part for part in parts if part)
 
 class Application(db.Model):
+    __table_args__ = (
+        # One application per student and job; also serves the duplicate check on apply
+        db.UniqueConstraint('student_id', 'job_id', name='uq_application_student_id_job_id'),
+        # A student's applications, newest first
+        db.Index('ix_application_student_id_created_at', 'student_id', 'created_at', 'id'),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     job_id = db.Column(db.Integer, db.ForeignKey('job.id'), nullable=False)
     student_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
     resume_path = db.Column(db.String(200), nullable=False)
+    # Content address of the uploaded file, see app.storage; NULL for uploads saved before it
+    file_sha256 = db.Column(db.String(64), db.ForeignKey('stored_file.sha256'), index=True)
     score = db.Column(db.Float)
     analysis_summary = db.Column(db.Text)
+    skills = db.Column(db.Text) # comma-separated, extracted by the analysis
     status = db.Column(db.String(20), default='pending') # pending, shortlisted, rejected, reviewed
+    analysis_status = db.Column(db.String(20), default='queued') # queued, running, done, failed
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
+# Sort key of a job's ranked applicant list: unscored (still queued) applications
+# sort after every scored one. The -1.0 is inlined rather than bound so queries
+# ordering by it can use the expression index below.
+application_rank = db.func.coalesce(Application.score, db.literal_column('-1.0'))
+db.Index('ix_application_job_id_score', Application.job_id, application_rank, Application.id)
+
 class Otp(db.Model):
+    __table_args__ = (
+        db.Index('ix_otp_email', 'email'),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     email = db.Column(db.String(120), nullable=False)
     otp_code = db.Column(db.String(6), nullable=False)
@@ -68,15 +123,53 @@ class Otp(db.Model):
     expires_at = db.Column(db.DateTime, nullable=False)
 
 class Resume(db.Model):
+    __table_args__ = (
+        db.Index('ix_resume_student_id_is_primary', 'student_id', 'is_primary'),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     student_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
     filename = db.Column(db.String(200), nullable=False)
     file_path = db.Column(db.String(500), nullable=False)
+    file_sha256 = db.Column(db.String(64), db.ForeignKey('stored_file.sha256'), index=True)
     is_primary = db.Column(db.Boolean, default=False)
     
     # Analysis results
     analysis_summary = db.Column(db.Text)
     skills = db.Column(db.Text)
     experience_level = db.Column(db.String(50))
+    analysis_status = db.Column(db.String(20), default='queued') # queued, running, done, failed
     
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+class StoredFile(db.Model):
+    """
+    An uploaded file, stored once per content under its SHA-256. ref_count is the
+    number of applications and resumes using it; see app.storage.
+    """
+    sha256 = db.Column(db.String(64), primary_key=True)
+    path = db.Column(db.String(500), nullable=False)
+    size = db.Column(db.Integer, nullable=False)
+    ref_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+class AnalysisTask(db.Model):
+    __table_args__ = (
+        # Workers poll for queued tasks and expired leases every second
+        db.Index('ix_analysis_task_status_lease_expires_at', 'status', 'lease_expires_at'),
+        db.Index('ix_analysis_task_kind_target_id', 'kind', 'target_id'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    kind = db.Column(db.String(20), nullable=False) # 'application', 'resume' or 'job_rescore'
+    target_id = db.Column(db.Integer, nullable=False)
+    status = db.Column(db.String(20), default='queued', nullable=False) # queued, running, done, failed
+    attempts = db.Column(db.Integer, default=0, nullable=False)
+    last_error = db.Column(db.Text)
+
+    # A running task belongs to lease_owner until lease_expires_at, after which any worker may reclaim it
+    lease_owner = db.Column(db.String(100))
+    lease_expires_at = db.Column(db.DateTime)
+
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
@@ -0,0 +1,98 @@
+import json
+import base64
+from datetime import datetime
+from urllib.parse import urlencode
+from flask import current_app, request
+from sqlalchemy import tuple_
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def _encode_value(value):
+    if isinstance(value, datetime):
+        return {'dt': value.isoformat()}
+    return value
+
+def _decode_value(value):
+    if isinstance(value, dict) and 'dt' in value:
+        return datetime.fromisoformat(value['dt'])
+    return value
+
+def encode_cursor(direction, values):
+    """Opaque cursor: direction ('next' or 'prev') plus the sort key of the row to continue from."""
+    payload = json.dumps({'d': direction, 'k': [_encode_value(v) for v in values]}, separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii').rstrip('=')
+
+def decode_cursor(cursor, key_count):
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+        direction, values = payload['d'], [_decode_value(v) for v in payload['k']]
+    except (ValueError, TypeError, KeyError):
+        raise InvalidCursor('Invalid cursor')
+    if direction not in ('next', 'prev') or len(values) != key_count:
+        raise InvalidCursor('Invalid cursor')
+    return direction, values
+
+def get_page_size():
+    default = current_app.config['PAGE_SIZE']
+    size = request.args.get('limit', default, type=int)
+    return min(max(size, 1), current_app.config['MAX_PAGE_SIZE'])
+
+def _page_url(cursor):
+    args = request.args.to_dict()
+    args['cursor'] = cursor
+    return f"{request.base_url}?{urlencode(args)}"
+
+def paginate(query, keys, row_key=None):
+    """
+    Keyset pagination, newest / highest first. keys are the columns (or expressions)
+    the listing is ordered by, descending, ending with a unique column such as the id.
+    Each page continues from the sort key of the last row seen instead of an OFFSET,
+    so every page costs the same however deep it is.
+
+    Reads ?cursor= and ?limit= from the request. Returns (rows, headers); the body
+    stays a plain list and the cursors travel in X-Next-Cursor / X-Prev-Cursor and a
+    Link header. row_key(row) returns a row's key values, by default the attributes
+    named like the key columns.
+    """
+    page_size = get_page_size()
+    row_key = row_key or (lambda row: [getattr(row, key.key) for key in keys])
+
+    cursor = request.args.get('cursor')
+    direction = 'next'
+    if cursor:
+        direction, values = decode_cursor(cursor, len(keys))
+        if direction == 'next':
+            query = query.filter(tuple_(*keys) < tuple_(*values))
+        else:
+            query = query.filter(tuple_(*keys) > tuple_(*values))
+
+    if direction == 'next':
+        query = query.order_by(*[key.desc() for key in keys])
+    else:
+        # Walk backwards from the cursor, then flip the page back into display order
+        query = query.order_by(*[key.asc() for key in keys])
+
+    rows = query.limit(page_size + 1).all()
+    has_more = len(rows) > page_size
+    rows = rows[:page_size]
+    if direction == 'prev':
+        rows.reverse()
+
+    headers = {}
+    links = []
+    if rows:
+        has_next = has_more if direction == 'next' else True
+        has_prev = bool(cursor) if direction == 'next' else has_more
+        if has_next:
+            headers['X-Next-Cursor'] = encode_cursor('next', row_key(rows[-1]))
+            links.append(f'<{_page_url(headers["X-Next-Cursor"])}>; rel="next"')
+        if has_prev:
+            headers['X-Prev-Cursor'] = encode_cursor('prev', row_key(rows[0]))
+            links.append(f'<{_page_url(headers["X-Prev-Cursor"])}>; rel="prev"')
+    if links:
+        headers['Link'] = ', '.join(links)
+    return rows, headers
@@ -0,0 +1,261 @@
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+from collections import OrderedDict
+from functools import wraps
+from flask import current_app, has_app_context, request, make_response
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from app import db
+
+DEFAULT_RESPONSE_CACHE_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'instance', 'response_cache.db'
+)
+
+# Response headers replayed from the cache along with the body
+CACHED_HEADERS = ('Content-Type', 'X-Next-Cursor', 'X-Prev-Cursor', 'Link')
+
+
+def _new_version(current=0):
+    # Time-based so versions, and the ETags built from them, never repeat across restarts
+    return max(current + 1, time.time_ns())
+
+
+class MemoryBackend:
+    """
+    In-process LRU of responses plus the version stamps. Only correct when a single
+    process serves the API and makes every change, e.g. the development server:
+    other processes never see its version bumps and serve their entries until the TTL.
+    """
+
+    def __init__(self, max_entries=1000, ttl=300):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._versions = {}
+        self._lock = threading.Lock()
+
+    def version(self, scope):
+        with self._lock:
+            if scope not in self._versions:
+                self._versions[scope] = _new_version()
+            return self._versions[scope]
+
+    def bump(self, scope):
+        with self._lock:
+            self._versions[scope] = _new_version(self._versions.get(scope, 0))
+
+    def get(self, key):
+        with self._lock:
+            item = self._entries.get(key)
+            if item is None:
+                return None
+            stored_at, entry = item
+            if self.ttl and time.time() - stored_at > self.ttl:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry
+
+    def set(self, key, entry):
+        with self._lock:
+            self._entries[key] = (time.time(), entry)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def stats(self):
+        with self._lock:
+            return {'backend': 'memory', 'entries': len(self._entries), 'max_entries': self.max_entries}
+
+
+class SQLiteBackend:
+    """
+    Responses and version stamps in a small SQLite file, shared by every worker
+    process on the host (gunicorn workers, CLI commands). Entries of outdated
+    versions are never read again and age out as the least recently stored.
+    """
+
+    def __init__(self, path=None, max_entries=10000, ttl=300):
+        self.path = path or DEFAULT_RESPONSE_CACHE_PATH
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._local = threading.local()
+        self._writes = 0
+
+        if self.path != ':memory:':
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        conn = self._conn()
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS response_cache ("
+            " key TEXT PRIMARY KEY,"
+            " entry TEXT NOT NULL,"
+            " stored_at REAL NOT NULL)"
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS ix_response_cache_stored_at ON response_cache (stored_at)")
+        conn.execute("CREATE TABLE IF NOT EXISTS response_cache_version (scope TEXT PRIMARY KEY, version INTEGER NOT NULL)")
+        conn.commit()
+
+    def _conn(self):
+        # sqlite3 connections cannot be shared across threads, keep one per thread
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    def version(self, scope):
+        conn = self._conn()
+        row = conn.execute("SELECT version FROM response_cache_version WHERE scope = ?", (scope,)).fetchone()
+        if row:
+            return row[0]
+        conn.execute("INSERT OR IGNORE INTO response_cache_version (scope, version) VALUES (?, ?)",
+                     (scope, _new_version()))
+        conn.commit()
+        return conn.execute("SELECT version FROM response_cache_version WHERE scope = ?", (scope,)).fetchone()[0]
+
+    def bump(self, scope):
+        conn = self._conn()
+        conn.execute(
+            "INSERT INTO response_cache_version (scope, version) VALUES (?, ?)"
+            " ON CONFLICT (scope) DO UPDATE SET version = max(version + 1, excluded.version)",
+            (scope, _new_version())
+        )
+        conn.commit()
+
+    def get(self, key):
+        row = self._conn().execute("SELECT entry, stored_at FROM response_cache WHERE key = ?", (key,)).fetchone()
+        if row is None or (self.ttl and time.time() - row[1] > self.ttl):
+            return None
+        return json.loads(row[0])
+
+    def set(self, key, entry):
+        conn = self._conn()
+        conn.execute("INSERT OR REPLACE INTO response_cache (key, entry, stored_at) VALUES (?, ?, ?)",
+                     (key, json.dumps(entry), time.time()))
+        conn.commit()
+        # Trimming is a sort over the whole table, do it every hundred writes
+        self._writes += 1
+        if self._writes % 100 == 0:
+            conn.execute(
+                "DELETE FROM response_cache WHERE key IN ("
+                " SELECT key FROM response_cache ORDER BY stored_at DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,)
+            )
+            conn.commit()
+
+    def stats(self):
+        entries = self._conn().execute("SELECT COUNT(*) FROM response_cache").fetchone()[0]
+        return {'backend': 'sqlite', 'entries': entries, 'max_entries': self.max_entries}
+
+
+def get_backend(app):
+    """Backend chosen by RESPONSE_CACHE: 'sqlite', 'memory' (single process only) or 'none' (disabled)."""
+    kind = app.config['RESPONSE_CACHE']
+    ttl = app.config['RESPONSE_CACHE_TTL']
+    if kind == 'memory':
+        return MemoryBackend(max_entries=app.config['RESPONSE_CACHE_SIZE'], ttl=ttl)
+    if kind == 'sqlite':
+        return SQLiteBackend(path=app.config['RESPONSE_CACHE_PATH'], max_entries=app.config['RESPONSE_CACHE_SIZE'],
+                             ttl=ttl)
+    if kind == 'none':
+        return None
+    raise ValueError(f"Unknown RESPONSE_CACHE backend: {kind}")
+
+
+def init_app(app):
+    app.extensions['response_cache'] = get_backend(app)
+
+
+def _backend():
+    return current_app.extensions.get('response_cache') if has_app_context() else None
+
+
+def invalidate(*scopes):
+    """
+    Marks scopes as changed by the current transaction. Their versions are bumped
+    once it commits, so a reader can never cache pre-commit data under the new
+    version; a rollback discards the marks.
+    """
+    db.session.info.setdefault('response_cache_scopes', set()).update(scopes)
+
+
+@event.listens_for(Session, 'after_commit')
+def _bump_versions(session):
+    scopes = session.info.pop('response_cache_scopes', None)
+    backend = _backend()
+    if scopes and backend is not None:
+        for scope in scopes:
+            backend.bump(scope)
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_versions(session):
+    session.info.pop('response_cache_scopes', None)
+
+
+def _digest(*parts):
+    h = hashlib.sha256()
+    for part in parts:
+        data = part.encode('utf-8')
+        h.update(str(len(data)).encode('ascii') + b':' + data)
+    return h.hexdigest()
+
+
+def cached(scope, vary=None, refresh=None):
+    """
+    Caches a GET view's 200 responses until the scope's version is bumped with
+    invalidate(). vary() returns what else the response depends on, such as the
+    caller's role. Responses carry a strong ETag derived from the version and the
+    request, so a client sending it back in If-None-Match gets 304 Not Modified
+    without the view or the database being touched.
+
+    refresh(data), for JSON responses, brings fields that change too often to cache
+    (applicant counters) up to date in the decoded body on every request, and returns
+    their current state, which is folded into the ETag. Such writes then need no
+    invalidation, at the cost of the query refresh makes per request.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            backend = _backend()
+            if backend is None:
+                return view(*args, **kwargs)
+
+            version = backend.version(scope)
+            key = _digest(scope, str(version), current_app.config['SQLALCHEMY_DATABASE_URI'],
+                          request.full_path, json.dumps(vary() if vary else None))
+            etag = key[:32]
+
+            # Weak comparison, as If-None-Match calls for: gzipped responses carry the weak form
+            if refresh is None and request.if_none_match.contains_weak(etag):
+                response = make_response('', 304)
+            else:
+                entry = backend.get(key)
+                if entry is None:
+                    response = make_response(view(*args, **kwargs))
+                    if response.status_code != 200:
+                        return response
+                    headers = {name: response.headers[name] for name in CACHED_HEADERS if name in response.headers}
+                    entry = {'body': response.get_data(as_text=True), 'headers': headers}
+                    backend.set(key, entry)
+                body = entry['body']
+                if refresh is not None:
+                    data = json.loads(body)
+                    state = refresh(data)
+                    if state is not None:
+                        etag = _digest(key, json.dumps(state))[:32]
+                        # Same framing as jsonify
+                        body = current_app.json.dumps(data) + '\n'
+                not_modified = refresh is not None and request.if_none_match.contains_weak(etag)
+                response = make_response('', 304) if not_modified else make_response(body, 200, entry['headers'])
+            response.set_etag(etag)
+            # Responses depend on the caller's token; clients may keep them but must revalidate
+            response.headers['Cache-Control'] = 'private, no-cache'
+            return response
+        return wrapper
+    return decorator
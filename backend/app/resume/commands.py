@@ -0,0 +1,68 @@
+import os
+import click
+from app import db, storage
+from app.models import Resume, Application, StoredFile
+from app.ai_engine.extraction import extract_texts
+from app.search import index_resume, index_application
+from . import bp
+
+@bp.cli.command('reindex')
+@click.option('--batch-size', default=200, show_default=True, help='Files extracted and committed per batch.')
+def reindex(batch_size):
+    """Rebuilds the resume search index from uploaded and applied-with resume files."""
+    indexed = 0
+    for model, path_attr, index in ((Resume, 'file_path', index_resume),
+                                    (Application, 'resume_path', index_application)):
+        ids = [row.id for row in model.query.with_entities(model.id).order_by(model.id).all()]
+        for start in range(0, len(ids), batch_size):
+            records = model.query.filter(model.id.in_(ids[start:start + batch_size])).all()
+            texts = extract_texts([getattr(record, path_attr) for record in records])
+            for record, text in zip(records, texts):
+                if text:
+                    index(record, text.strip())
+                    indexed += 1
+            db.session.commit()
+    click.echo(f'Indexed {indexed} resumes.')
+
+
+@bp.cli.command('dedupe-uploads')
+def dedupe_uploads():
+    """Moves resume files saved before content addressing into the deduplicated store."""
+    adopted = missing = 0
+    for model, path_attr in ((Resume, 'file_path'), (Application, 'resume_path')):
+        for record in model.query.filter(model.file_sha256.is_(None)).order_by(model.id).all():
+            path = getattr(record, path_attr)
+            if not path or not os.path.isfile(path):
+                missing += 1
+                continue
+            extension = path.rsplit('.', 1)[1].lower() if '.' in os.path.basename(path) else 'bin'
+            with open(path, 'rb') as f:
+                record.file_sha256, stored_path = storage.store(f, extension)
+            setattr(record, path_attr, stored_path)
+            db.session.commit()
+            # Only once the row points at the stored copy
+            if os.path.abspath(path) != os.path.abspath(stored_path):
+                os.remove(path)
+            adopted += 1
+    click.echo(f'Moved {adopted} files into the store, {missing} missing on disk.')
+
+
+@bp.cli.command('gc-uploads')
+@click.option('--min-age', default=3600, show_default=True,
+              help='Seconds an unreferenced file must be old before it is removed.')
+def gc_uploads(min_age):
+    """Recounts references to stored files and removes files nothing refers to."""
+    counts = storage.referenced_counts()
+    fixed = released = 0
+    for stored in StoredFile.query.all():
+        actual = counts.get(stored.sha256, 0)
+        if stored.ref_count != actual:
+            stored.ref_count = actual
+            fixed += 1
+    db.session.flush()
+    for stored in StoredFile.query.filter(StoredFile.ref_count <= 0).all():
+        storage.release(stored.sha256, 0)
+        released += 1
+    db.session.commit()
+    removed = storage.collect_garbage(min_age)
+    click.echo(f'Fixed {fixed} reference counts, released {released} files, removed {removed} orphaned files.')
@@ -1,10 +1,10 @@
-from flask import jsonify, request, current_app
+from flask import jsonify, request
 from flask_jwt_extended import jwt_required, get_jwt_identity, get_jwt
 from werkzeug.utils import secure_filename
-from app import db
-from app.models import Resume, User
-import os
-from datetime import datetime
+from app import db, storage
+from app.models import Resume, User, Application
+from app.analysis.tasks import enqueue
+from app.search import resume_index, split_resume_doc_id
 from . import bp
 
 ALLOWED_EXTENSIONS = {'pdf', 'docx', 'doc'}
@@ -32,14 +32,8 @@ def upload_resume():
         filename = secure_filename(file.filename)
         student_id = get_jwt_identity()
         
-        # Ensure upload directory exists
-        upload_folder = os.path.join(current_app.root_path, '..', 'uploads', 'resumes')
-        os.makedirs(upload_folder, exist_ok=True)
-        
-        # Save file with unique name
-        unique_filename = f"resume_{student_id}_{int(datetime.utcnow().timestamp())}_{filename}"
-        file_path = os.path.join(upload_folder, unique_filename)
-        file.save(file_path)
+        # Stored once per content, shared with applications made with the same file
+        file_sha256, file_path = storage.store(file.stream, file.filename.rsplit('.', 1)[1].lower())
 
         # Create Resume record
         # Check if primary resume exists, if so, this one is not primary unless specified?
@@ -51,34 +45,23 @@ def upload_resume():
             student_id=student_id,
             filename=filename,
             file_path=file_path,
-            is_primary=True # Default to true for now
+            file_sha256=file_sha256,
+            is_primary=True, # Default to true for now
+            analysis_status='queued'
         )
-        
-        # Perform AI Analysis
-        from app.ai_engine.analyzer import analyzer
-        
-        text = analyzer.extract_text(file_path)
-        if text:
-            analysis_result = analyzer.analyze_resume(text)
-            
-            resume.analysis_summary = analysis_result.get('summary', 'Analysis failed.')
-            resume.skills = ', '.join(analysis_result.get('skills', []))
-            resume.experience_level = analysis_result.get('experience_level', 'Unknown')
-            
-            db.session.add(resume)
-            db.session.commit()
-
-            return jsonify({
-                'message': 'Resume uploaded and analyzed successfully', 
-                'resume_id': resume.id,
-                'analysis': analysis_result
-            }), 201
-        else:
-            # Fallback if text extraction fails
-            resume.analysis_summary = "Text extraction failed."
-            db.session.add(resume)
-            db.session.commit()
-            return jsonify({'message': 'Resume uploaded but text extraction failed', 'resume_id': resume.id}), 201
+        db.session.add(resume)
+        db.session.flush()
+
+        # AI Analysis runs on the background workers, poll /api/analysis/tasks/<task_id> for the result
+        task = enqueue('resume', resume.id)
+        db.session.commit()
+
+        return jsonify({
+            'message': 'Resume uploaded, analysis queued',
+            'resume_id': resume.id,
+            'analysis_status': resume.analysis_status,
+            'task_id': task.id
+        }), 201
 
     return jsonify({'error': 'Invalid file type. Only PDF and DOCX allowed.'}), 400
 
@@ -95,5 +78,65 @@ def get_resume():
         'id': resume.id,
         'filename': resume.filename,
         'uploaded_at': resume.created_at.isoformat(),
-        'analysis_summary': resume.analysis_summary
+        'analysis_summary': resume.analysis_summary,
+        'skills': resume.skills.split(', ') if resume.skills else [],
+        'experience_level': resume.experience_level,
+        'analysis_status': resume.analysis_status
+    }), 200
+
+@bp.route('/search', methods=['GET'])
+@jwt_required()
+def search_resumes():
+    """
+    Full-text search over the extracted text and skills of every uploaded and applied-with
+    resume, best match first. Supports AND / OR / NOT (or -term), "quoted phrases" and
+    prefix* terms. Paginated with ?page= and ?per_page= (max 100).
+    """
+    claims = get_jwt()
+    if claims.get('role') != 'recruiter':
+        return jsonify({'error': 'Access denied. Recruiters only.'}), 403
+
+    query = (request.args.get('q') or '').strip()
+    if not query:
+        return jsonify({'error': 'Search query (q) is required'}), 400
+    page = max(request.args.get('page', 1, type=int), 1)
+    per_page = min(max(request.args.get('per_page', 20, type=int), 1), 100)
+
+    total, hits = resume_index.search(query, limit=per_page, offset=(page - 1) * per_page)
+
+    # One query per source table for the whole page
+    refs = [split_resume_doc_id(doc_id) for doc_id, _, _ in hits]
+    resume_ids = [ref_id for kind, ref_id in refs if kind == 'resume']
+    application_ids = [ref_id for kind, ref_id in refs if kind == 'application']
+    resumes = {r.id: r for r in Resume.query.filter(Resume.id.in_(resume_ids)).all()} if resume_ids else {}
+    applications = ({a.id: a for a in Application.query.filter(Application.id.in_(application_ids)).all()}
+                    if application_ids else {})
+    student_ids = {r.student_id for r in resumes.values()} | {a.student_id for a in applications.values()}
+    students = {u.id: u for u in User.query.filter(User.id.in_(student_ids)).all()} if student_ids else {}
+
+    results = []
+    for (kind, ref_id), (_, score, snippet) in zip(refs, hits):
+        record = resumes.get(ref_id) if kind == 'resume' else applications.get(ref_id)
+        if record is None:
+            # Deleted since it was indexed
+            continue
+        student = students.get(record.student_id)
+        results.append({
+            'type': kind,
+            'id': record.id,
+            'student_id': record.student_id,
+            'name': (student.full_name if student else None) or "Unknown",
+            'email': student.email if student else None,
+            'job_id': record.job_id if kind == 'application' else None,
+            'skills': record.skills.split(', ') if record.skills else [],
+            'score': score,
+            'snippet': snippet
+        })
+
+    return jsonify({
+        'query': query,
+        'total': total,
+        'page': page,
+        'per_page': per_page,
+        'results': results
     }), 200
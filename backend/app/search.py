@@ -0,0 +1,244 @@
+import re
+from sqlalchemy import event, text
+from app import db
+
+# Users type Google-style queries ("kubernetes AND go", "\"machine learning\" -java", "pyth*");
+# they are parsed into terms and operators and re-rendered for the database's own syntax
+# so user input is never passed to MATCH / to_tsquery verbatim.
+QUERY_TOKEN_RE = re.compile(r'"[^"]*"|\S+')
+WORD_RE = re.compile(r'\w+', re.UNICODE)
+OPERATORS = {'AND', 'OR', 'NOT'}
+
+
+def parse_query(query, prefix=False):
+    """
+    Returns a list of ('term', [words], is_prefix) and ('op', 'AND'|'OR'|'NOT') items.
+    Adjacent terms are joined with AND; dangling or repeated operators are dropped.
+    With prefix=True the last word of every term matches as a prefix.
+    """
+    items = []
+    negate_next = False
+    for token in QUERY_TOKEN_RE.findall(query or ''):
+        if token in OPERATORS:
+            if token == 'NOT':
+                negate_next = True
+            elif items and items[-1][0] == 'term':
+                items.append(('op', token))
+            continue
+        if token.startswith('-') and len(token) > 1:
+            negate_next, token = True, token[1:]
+        words = WORD_RE.findall(token.strip('"'))
+        if not words:
+            continue
+        is_prefix = prefix or (token.endswith('*') and not token.startswith('"'))
+        if items and items[-1][0] == 'term':
+            items.append(('op', 'AND'))
+        if negate_next:
+            if not items:
+                # A query cannot start with NOT, there is nothing to subtract from
+                negate_next = False
+                continue
+            items[-1] = ('op', 'NOT')
+            negate_next = False
+        items.append(('term', words, is_prefix))
+    while items and items[-1][0] == 'op':
+        items.pop()
+    return items
+
+
+def to_fts5(items):
+    parts = []
+    for item in items:
+        if item[0] == 'op':
+            parts.append(item[1])
+        else:
+            _, words, is_prefix = item
+            parts.append('"' + ' '.join(words) + '"' + ('*' if is_prefix else ''))
+    return ' '.join(parts)
+
+
+def to_tsquery(items):
+    parts = []
+    for item in items:
+        if item[0] == 'op':
+            parts.append({'AND': '&', 'OR': '|', 'NOT': '& !'}[item[1]])
+        else:
+            _, words, is_prefix = item
+            words = [word.lower() for word in words]
+            if is_prefix:
+                words[-1] += ':*'
+            parts.append('(' + ' <-> '.join(words) + ')')
+    return ' '.join(parts)
+
+
+class SearchIndex:
+    """
+    A full-text index over a few text columns, keyed by an integer doc_id.
+
+    On SQLite it is an FTS5 virtual table ranked with bm25(); on PostgreSQL a table
+    with a weighted, generated tsvector column and a GIN index, ranked with
+    ts_rank_cd(). Columns are listed from most to least important, with one weight each. Rows are written in the
+    caller's session, so index updates commit or roll back with the data they describe.
+    """
+
+    def __init__(self, name, columns, weights, snippet_column=None):
+        self.name = name
+        self.columns = columns
+        self.weights = weights
+        self.snippet_column = snippet_column or columns[-1]
+
+    def ddl(self, dialect):
+        if dialect == 'sqlite':
+            return [f"CREATE VIRTUAL TABLE IF NOT EXISTS {self.name} USING fts5("
+                    f"{', '.join(self.columns)}, tokenize='porter unicode61')"]
+        if dialect == 'postgresql':
+            labels = 'ABCD'
+            vector = ' || '.join(
+                f"setweight(to_tsvector('english', coalesce({column}, '')), '{labels[min(i, 3)]}')"
+                for i, column in enumerate(self.columns)
+            )
+            return [
+                f"CREATE TABLE IF NOT EXISTS {self.name} (doc_id BIGINT PRIMARY KEY, "
+                + ''.join(f"{column} TEXT, " for column in self.columns)
+                + f"tsv tsvector GENERATED ALWAYS AS ({vector}) STORED)",
+                f"CREATE INDEX IF NOT EXISTS ix_{self.name}_tsv ON {self.name} USING GIN (tsv)",
+            ]
+        raise NotImplementedError(f"Full-text search is not supported on {dialect}")
+
+    def _dialect(self, session):
+        return session.get_bind().dialect.name
+
+    def upsert(self, doc_id, values, session=None):
+        self.upsert_many([(doc_id, values)], session=session)
+
+    def upsert_many(self, docs, session=None):
+        """Writes [(doc_id, values), ...] with one executemany per statement."""
+        session = session or db.session
+        params = []
+        for doc_id, values in docs:
+            row = {'doc_id': doc_id}
+            row.update({column: values.get(column) or '' for column in self.columns})
+            params.append(row)
+        if not params:
+            return
+        columns = ', '.join(self.columns)
+        placeholders = ', '.join(f":{column}" for column in self.columns)
+        if self._dialect(session) == 'sqlite':
+            session.execute(text(f"DELETE FROM {self.name} WHERE rowid = :doc_id"), params)
+            session.execute(text(f"INSERT INTO {self.name} (rowid, {columns}) VALUES (:doc_id, {placeholders})"), params)
+        else:
+            updates = ', '.join(f"{column} = EXCLUDED.{column}" for column in self.columns)
+            session.execute(text(
+                f"INSERT INTO {self.name} (doc_id, {columns}) VALUES (:doc_id, {placeholders}) "
+                f"ON CONFLICT (doc_id) DO UPDATE SET {updates}"
+            ), params)
+
+    def delete(self, doc_id, session=None):
+        session = session or db.session
+        key = 'rowid' if self._dialect(session) == 'sqlite' else 'doc_id'
+        session.execute(text(f"DELETE FROM {self.name} WHERE {key} = :doc_id"), {'doc_id': doc_id})
+
+    def search(self, query, limit=20, offset=0, prefix=False, session=None):
+        """
+        Returns (total, [(doc_id, score, snippet), ...]) for one page of matches, best first.
+        Higher scores are better; snippets mark matched words with <mark></mark>.
+        """
+        session = session or db.session
+        items = parse_query(query, prefix=prefix)
+        if not items:
+            return 0, []
+        params = {'limit': limit, 'offset': offset}
+
+        if self._dialect(session) == 'sqlite':
+            params['q'] = to_fts5(items)
+            snippet_index = self.columns.index(self.snippet_column)
+            weights = ', '.join(str(weight) for weight in self.weights)
+            total = session.execute(
+                text(f"SELECT count(*) FROM {self.name} WHERE {self.name} MATCH :q"), params
+            ).scalar()
+            rows = session.execute(text(
+                f"SELECT rowid, -bm25({self.name}, {weights}) AS score, "
+                f"snippet({self.name}, {snippet_index}, '<mark>', '</mark>', '...', 16) "
+                f"FROM {self.name} WHERE {self.name} MATCH :q "
+                f"ORDER BY bm25({self.name}, {weights}) LIMIT :limit OFFSET :offset"
+            ), params).all()
+        else:
+            params['q'] = to_tsquery(items)
+            # ts_rank_cd takes weights for labels D, C, B, A, scaled to at most 1.
+            # Columns past the fourth share label D and the fourth column's weight.
+            label_weights = [0.1] * 4
+            for i, weight in enumerate(self.weights[:4]):
+                label_weights[3 - i] = weight / max(self.weights)
+            weights = '{' + ', '.join(str(weight) for weight in label_weights) + '}'
+            total = session.execute(
+                text(f"SELECT count(*) FROM {self.name} WHERE tsv @@ to_tsquery('english', :q)"), params
+            ).scalar()
+            # Headlines are expensive, so they are only computed for the rows on this page
+            rows = session.execute(text(
+                f"SELECT page.doc_id, page.score, ts_headline('english', page.{self.snippet_column}, "
+                f"to_tsquery('english', :q), 'StartSel=<mark>, StopSel=</mark>, MaxWords=24, MinWords=8') "
+                f"FROM (SELECT doc_id, {self.snippet_column}, "
+                f"ts_rank_cd('{weights}', tsv, to_tsquery('english', :q), 32) AS score "
+                f"FROM {self.name} WHERE tsv @@ to_tsquery('english', :q) "
+                f"ORDER BY score DESC LIMIT :limit OFFSET :offset) AS page ORDER BY page.score DESC"
+            ), params).all()
+        return total, [(row[0], round(float(row[1]), 4), row[2]) for row in rows]
+
+
+# Resumes uploaded to a profile and resumes attached to applications share one index;
+# the doc_id encodes which table a row came from
+resume_index = SearchIndex('resume_search', ['skills', 'content'], weights=[3.0, 1.0])
+
+# Open job postings, searched by students
+job_index = SearchIndex('job_search', ['title', 'skills', 'requirements', 'company', 'description', 'location'],
+                        weights=[5.0, 4.0, 2.0, 2.0, 1.0, 1.0], snippet_column='description')
+
+INDEXES = [resume_index, job_index]
+
+
+def resume_doc_id(kind, ref_id):
+    return ref_id * 2 + (1 if kind == 'application' else 0)
+
+
+def split_resume_doc_id(doc_id):
+    return ('application' if doc_id % 2 else 'resume'), doc_id // 2
+
+
+def index_resume(resume, text_content):
+    resume_index.upsert(resume_doc_id('resume', resume.id), {'skills': resume.skills, 'content': text_content})
+
+
+def index_application(application, text_content):
+    resume_index.upsert(resume_doc_id('application', application.id),
+                        {'skills': application.skills, 'content': text_content})
+
+
+def index_job(job):
+    # Only postings students can apply to are searchable; drafts and closed jobs drop out
+    if job.status == 'active':
+        job_index.upsert(job.id, {column: getattr(job, column) for column in job_index.columns})
+    else:
+        job_index.delete(job.id)
+
+
+def unindex_job(job_id):
+    job_index.delete(job_id)
+
+
+def create_indexes(connection):
+    for index in INDEXES:
+        for statement in index.ddl(connection.dialect.name):
+            connection.execute(text(statement))
+
+
+@event.listens_for(db.metadata, 'after_create')
+def _create_indexes(target, connection, **kw):
+    # db.create_all() (init_db.py) creates the search tables too; migrations create them explicitly
+    create_indexes(connection)
+
+
+def include_object(obj, name, type_, reflected, compare_to):
+    """Alembic filter: the search tables are managed by hand, autogenerate must not try to drop them."""
+    if type_ == 'table' and reflected and compare_to is None:
+        return not any(name == index.name or name.startswith(index.name + '_') for index in INDEXES)
+    return True
@@ -0,0 +1,162 @@
+import os
+import time
+import hashlib
+import tempfile
+from flask import current_app
+from sqlalchemy import event
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from app import db
+from app.models import StoredFile, Application, Resume
+
+CHUNK_SIZE = 1024 * 1024
+
+
+def storage_dir():
+    return os.path.join(current_app.root_path, '..', 'uploads', 'files')
+
+
+def blob_path(sha256, extension):
+    # Two-character fan-out keeps directories small
+    return os.path.join(storage_dir(), sha256[:2], f"{sha256}.{extension}")
+
+
+def store(stream, extension):
+    """
+    Stores an uploaded file once per content and takes a reference to it in the
+    current transaction. The upload is hashed while it is written to a temporary
+    file, which is dropped if the content is already stored. A file stored for the
+    first time is removed again if the transaction rolls back (e.g. on a duplicate
+    application), so no file is left without a row. Returns the
+    StoredFile's (sha256, path); the caller saves both on its Application / Resume.
+    """
+    directory = storage_dir()
+    os.makedirs(directory, exist_ok=True)
+    h = hashlib.sha256()
+    size = 0
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.upload')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            for chunk in iter(lambda: stream.read(CHUNK_SIZE), b''):
+                h.update(chunk)
+                f.write(chunk)
+                size += len(chunk)
+        sha256 = h.hexdigest()
+
+        path, created = _acquire(sha256, blob_path(sha256, extension.lower()), size)
+        # A file released by a concurrent transaction may have been removed since; put it back
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            os.replace(tmp_path, path)
+            if created:
+                db.session.info.setdefault('storage_created', []).append(path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    return sha256, path
+
+
+def _acquire(sha256, path, size):
+    """
+    Adds a reference to sha256, creating its row on first use. Returns the stored
+    path and whether the row was created.
+    """
+    # The update runs even when there is no row yet: on SQLite it opens the transaction,
+    # without which the savepoint below would commit the new row on release
+    if StoredFile.query.filter_by(sha256=sha256).update(
+            {StoredFile.ref_count: StoredFile.ref_count + 1}, synchronize_session=False):
+        return db.session.query(StoredFile.path).filter_by(sha256=sha256).scalar(), False
+    try:
+        # Savepoint: a concurrent upload of the same content may insert the row first
+        with db.session.begin_nested():
+            db.session.add(StoredFile(sha256=sha256, path=path, size=size, ref_count=1))
+        return path, True
+    except IntegrityError:
+        StoredFile.query.filter_by(sha256=sha256).update(
+            {StoredFile.ref_count: StoredFile.ref_count + 1}, synchronize_session=False)
+        return db.session.query(StoredFile.path).filter_by(sha256=sha256).scalar(), False
+
+
+def release(sha256, count=1):
+    """
+    Drops count references to a stored file. When none remain its row is deleted and
+    the file moved aside, then removed once the transaction commits (or put back if it
+    rolls back). Call after the referencing rows are deleted.
+    """
+    if not sha256:
+        return
+    StoredFile.query.filter_by(sha256=sha256).update(
+        {StoredFile.ref_count: StoredFile.ref_count - count}, synchronize_session=False)
+    stored = db.session.query(StoredFile.path).filter(
+        StoredFile.sha256 == sha256, StoredFile.ref_count <= 0
+    ).first()
+    if stored is None:
+        return
+    StoredFile.query.filter_by(sha256=sha256).delete(synchronize_session=False)
+    # Moved aside before commit, so an upload of the same content after the commit
+    # writes a fresh copy instead of finding a file that is about to be removed
+    tombstone = f"{stored.path}.deleted-{os.getpid()}-{time.time_ns()}"
+    try:
+        os.replace(stored.path, tombstone)
+    except OSError:
+        return
+    db.session.info.setdefault('storage_tombstones', []).append((stored.path, tombstone))
+
+
+@event.listens_for(Session, 'after_commit')
+def _remove_tombstones(session):
+    session.info.pop('storage_created', None)
+    for _, tombstone in session.info.pop('storage_tombstones', []):
+        try:
+            os.remove(tombstone)
+        except OSError:
+            pass
+
+
+@event.listens_for(Session, 'after_rollback')
+def _restore_tombstones(session):
+    for path, tombstone in session.info.pop('storage_tombstones', []):
+        try:
+            if not os.path.exists(path):
+                os.replace(tombstone, path)
+            else:
+                os.remove(tombstone)
+        except OSError:
+            pass
+    for path in session.info.pop('storage_created', []):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+def collect_garbage(min_age=3600):
+    """
+    Removes files in the store that no row refers to (left behind by uploads whose
+    transaction rolled back) once they are older than min_age seconds, so uploads
+    still in flight are never touched. Returns the number of files removed.
+    """
+    directory = storage_dir()
+    if not os.path.isdir(directory):
+        return 0
+    known = {os.path.abspath(path) for (path,) in db.session.query(StoredFile.path)}
+    cutoff = time.time() - min_age
+    removed = 0
+    for root, _, files in os.walk(directory):
+        for name in files:
+            path = os.path.abspath(os.path.join(root, name))
+            if path in known or os.path.getmtime(path) > cutoff:
+                continue
+            os.remove(path)
+            removed += 1
+    return removed
+
+
+def referenced_counts():
+    """sha256 -> number of applications and resumes referring to it."""
+    counts = {}
+    for model in (Application, Resume):
+        for sha256, count in db.session.query(model.file_sha256, db.func.count(model.id)).filter(
+                model.file_sha256.isnot(None)).group_by(model.file_sha256):
+            counts[sha256] = counts.get(sha256, 0) + count
+    return counts
@@ -0,0 +1,63 @@
+"""
+Measures cold-start cost of the backend: importing the app package, create_app(),
+and the first get_analyzer() call, each in a fresh interpreter.
+
+Usage: python bench_startup.py [--runs 5]
+"""
+import os
+import sys
+import time
+import json
+import argparse
+import statistics
+import subprocess
+
+HEAVY_MODULES = ['google.generativeai', 'grpc', 'openai', 'pypdf', 'docx', 'numpy']
+
+PROBE = """
+import sys, time, json
+started = time.perf_counter()
+import app
+imported = time.perf_counter()
+flask_app = app.create_app()
+created = time.perf_counter()
+loaded = [m for m in {heavy!r} if m in sys.modules]
+from app.ai_engine.analyzer import get_analyzer
+get_analyzer()
+analyzer_ready = time.perf_counter()
+print(json.dumps({{
+    'import_ms': (imported - started) * 1000,
+    'create_app_ms': (created - imported) * 1000,
+    'first_analyzer_ms': (analyzer_ready - created) * 1000,
+    'heavy_modules_after_create_app': loaded
+}}))
+"""
+
+def run_once():
+    env = dict(os.environ, EXTRACT_WORKERS='0')
+    started = time.perf_counter()
+    output = subprocess.run(
+        [sys.executable, '-c', PROBE.format(heavy=HEAVY_MODULES)],
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+        env=env, capture_output=True, text=True, check=True
+    ).stdout
+    total_ms = (time.perf_counter() - started) * 1000
+    result = json.loads(output.strip().splitlines()[-1])
+    result['process_ms'] = total_ms
+    return result
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark backend cold start.')
+    parser.add_argument('--runs', type=int, default=5)
+    args = parser.parse_args()
+
+    runs = [run_once() for _ in range(args.runs)]
+    print(f"Cold start over {args.runs} runs (median / max, ms):")
+    for key in ('import_ms', 'create_app_ms', 'first_analyzer_ms', 'process_ms'):
+        values = [run[key] for run in runs]
+        print(f"  {key:<20} {statistics.median(values):8.1f} {max(values):8.1f}")
+    loaded = runs[-1]['heavy_modules_after_create_app']
+    print(f"Heavy modules loaded by create_app(): {', '.join(loaded) if loaded else 'none'}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,144 @@
+"""
+Prints the query plan of every SQL statement the hot endpoints run, against a
+throwaway SQLite database seeded with a large dataset. Use it to check that the
+indexes are picked up (SEARCH ... USING INDEX) rather than full table scans.
+
+Usage: python explain_queries.py [--scale N]
+"""
+import io
+import os
+import sys
+import argparse
+import tempfile
+from datetime import datetime, timedelta
+
+tmp = tempfile.mkdtemp()
+os.environ['DATABASE_URL'] = 'sqlite:///' + os.path.join(tmp, 'explain.db')
+# Measures the queries themselves, so responses must not come from the cache
+os.environ['RESPONSE_CACHE'] = 'none'
+
+from sqlalchemy import event, insert, text
+from flask_jwt_extended import create_access_token
+from app import create_app, db
+from app.models import User, Job, Application, Otp, Resume
+
+app = create_app()
+statements = []
+
+def seed(scale):
+    """
+    Bulk inserts scale recruiters with 100 jobs each, 50 * scale students with 20
+    applications each, one resume per student (plus an older non-primary one) and
+    an OTP per student.
+    """
+    db.drop_all()
+    db.create_all()
+    now = datetime.utcnow()
+    recruiters = scale
+    students = 50 * scale
+    jobs = recruiters * 100
+
+    db.session.execute(insert(User), [
+        {'id': i, 'email': f'recruiter{i}@example.com', 'role': 'recruiter', 'full_name': f'Recruiter {i}'}
+        for i in range(1, recruiters + 1)
+    ] + [
+        {'id': recruiters + i, 'email': f'student{i}@example.com', 'role': 'student', 'full_name': f'Student {i}'}
+        for i in range(1, students + 1)
+    ])
+    db.session.execute(insert(Job), [
+        {'id': i, 'title': f'Job {i}', 'description': 'Python developer', 'recruiter_id': (i % recruiters) + 1,
+         'created_at': now - timedelta(minutes=i)}
+        for i in range(1, jobs + 1)
+    ])
+    applications = []
+    for s in range(students):
+        student_id = recruiters + s + 1
+        for k in range(20):
+            job_id = (s * 7 + k * 13) % jobs + 1
+            applications.append({
+                'job_id': job_id, 'student_id': student_id, 'resume_path': 'resume.pdf',
+                'score': (s * 31 + k) % 100 if k % 5 else None, 'status': 'pending',
+                'created_at': now - timedelta(seconds=s * 20 + k)
+            })
+    # The job offsets above can repeat for a student; the unique constraint allows one each
+    unique = {(a['student_id'], a['job_id']): a for a in applications}
+    for start in range(0, len(unique), 10000):
+        db.session.execute(insert(Application), list(unique.values())[start:start + 10000])
+    db.session.execute(insert(Resume), [
+        {'student_id': recruiters + s + 1, 'filename': 'resume.pdf', 'file_path': 'resume.pdf', 'is_primary': primary}
+        for s in range(students) for primary in (False, True)
+    ])
+    db.session.execute(insert(Otp), [
+        {'email': f'student{i}@example.com', 'otp_code': '123456', 'expires_at': now + timedelta(minutes=10)}
+        for i in range(1, students + 1)
+    ])
+    db.session.commit()
+    # Give the planner table statistics, as a long-running database would have
+    db.session.execute(text('ANALYZE'))
+    db.session.commit()
+    return recruiters + 1, Application.query.filter_by(student_id=recruiters + 1).first()
+
+def capture(client, method, url, token=None, **kwargs):
+    db.session.remove()
+    statements.clear()
+    headers = {'Authorization': f'Bearer {token}'} if token else {}
+    response = client.open(url, method=method, headers=headers, **kwargs)
+    return response, list(statements)
+
+def explain(statement, parameters):
+    with db.engine.connect() as conn:
+        return conn.exec_driver_sql('EXPLAIN QUERY PLAN ' + statement, parameters).fetchall()
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--scale', type=int, default=20, help='recruiters to seed (50 students each)')
+    args = parser.parse_args()
+
+    client = app.test_client()
+    with app.app_context():
+        print(f'Seeding (scale {args.scale})...')
+        student_id, application = seed(args.scale)
+        print(f'{Job.query.count()} jobs, {Application.query.count()} applications, '
+              f'{User.query.count()} users, {Resume.query.count()} resumes\n')
+
+        recruiter_token = create_access_token(identity='1', additional_claims={'role': 'recruiter'})
+        student_token = create_access_token(identity=str(student_id), additional_claims={'role': 'student'})
+        job_id = application.job_id
+        recruiter_of_job = str(db.session.get(Job, job_id).recruiter_id)
+        owner_token = create_access_token(identity=recruiter_of_job, additional_claims={'role': 'recruiter'})
+
+        event.listen(db.engine, 'before_cursor_execute',
+                     lambda conn, cursor, statement, parameters, context, executemany:
+                     statements.append((statement, parameters)) if not executemany else None)
+
+        endpoints = [
+            ('get_jobs (recruiter)', 'GET', '/api/jobs/?limit=20', recruiter_token, {}),
+            ('get_jobs (student)', 'GET', '/api/jobs/?limit=20', student_token, {}),
+            ('my_applications', 'GET', '/api/applications/my-applications?limit=20', student_token, {}),
+            ('get_job_applications', 'GET', f'/api/jobs/{job_id}/applications?limit=20', owner_token, {}),
+            ('apply_job (duplicate)', 'POST', '/api/applications/', student_token,
+             {'data': {'job_id': str(job_id), 'resume': (io.BytesIO(b'%PDF-1.4'), 'resume.pdf')},
+              'content_type': 'multipart/form-data'}),
+            ('get_resume', 'GET', '/api/resume/', student_token, {}),
+            ('verify_otp', 'POST', '/api/auth/verify-otp', None,
+             {'json': {'email': 'student1@example.com', 'otp': '000000'}}),
+        ]
+        for name, method, url, token, kwargs in endpoints:
+            response, captured = capture(client, method, url, token, **kwargs)
+            pages = [(name, response, captured)]
+            cursor = response.headers.get('X-Next-Cursor')
+            if cursor:
+                # The keyset filter of a later page
+                pages.append((f'{name}, next page',) + capture(client, method, f'{url}&cursor={cursor}', token))
+            for label, response, captured in pages:
+                print(f'=== {label}: {method} {url} -> {response.status_code}')
+                for statement, parameters in captured:
+                    if not statement.lstrip().upper().startswith('SELECT'):
+                        continue
+                    print('  ' + ' '.join(statement.split()))
+                    for row in explain(statement, parameters):
+                        print(f'    {row[-1]}')
+                print()
+
+if __name__ == '__main__':
+    sys.exit(main())
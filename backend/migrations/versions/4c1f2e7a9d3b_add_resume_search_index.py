@@ -0,0 +1,38 @@
+"""Add resume search index
+
+Revision ID: 4c1f2e7a9d3b
+Revises: b0a05986deb4
+Create Date: 2026-10-18 18:40:12.512304
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '4c1f2e7a9d3b'
+down_revision = 'b0a05986deb4'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Full-text tables are not expressible as SQLAlchemy models, see app/search.py.
+    # Existing resumes are indexed with `flask resume reindex`.
+    if op.get_bind().dialect.name == 'postgresql':
+        op.execute(
+            "CREATE TABLE IF NOT EXISTS resume_search (doc_id BIGINT PRIMARY KEY, skills TEXT, content TEXT, "
+            "tsv tsvector GENERATED ALWAYS AS ("
+            "setweight(to_tsvector('english', coalesce(skills, '')), 'A') || "
+            "setweight(to_tsvector('english', coalesce(content, '')), 'B')) STORED)"
+        )
+        op.execute("CREATE INDEX IF NOT EXISTS ix_resume_search_tsv ON resume_search USING GIN (tsv)")
+    else:
+        op.execute(
+            "CREATE VIRTUAL TABLE IF NOT EXISTS resume_search USING fts5("
+            "skills, content, tokenize='porter unicode61')"
+        )
+
+
+def downgrade():
+    op.execute("DROP TABLE IF EXISTS resume_search")
@@ -0,0 +1,42 @@
+"""Add job search index
+
+Revision ID: 9e3b5d21c6f4
+Revises: 4c1f2e7a9d3b
+Create Date: 2026-10-18 18:52:37.104918
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9e3b5d21c6f4'
+down_revision = '4c1f2e7a9d3b'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # See app/search.py; existing jobs are indexed with `flask jobs reindex`
+    if op.get_bind().dialect.name == 'postgresql':
+        op.execute(
+            "CREATE TABLE IF NOT EXISTS job_search (doc_id BIGINT PRIMARY KEY, title TEXT, skills TEXT, "
+            "requirements TEXT, company TEXT, description TEXT, location TEXT, "
+            "tsv tsvector GENERATED ALWAYS AS ("
+            "setweight(to_tsvector('english', coalesce(title, '')), 'A') || "
+            "setweight(to_tsvector('english', coalesce(skills, '')), 'B') || "
+            "setweight(to_tsvector('english', coalesce(requirements, '')), 'C') || "
+            "setweight(to_tsvector('english', coalesce(company, '')), 'D') || "
+            "setweight(to_tsvector('english', coalesce(description, '')), 'D') || "
+            "setweight(to_tsvector('english', coalesce(location, '')), 'D')) STORED)"
+        )
+        op.execute("CREATE INDEX IF NOT EXISTS ix_job_search_tsv ON job_search USING GIN (tsv)")
+    else:
+        op.execute(
+            "CREATE VIRTUAL TABLE IF NOT EXISTS job_search USING fts5("
+            "title, skills, requirements, company, description, location, tokenize='porter unicode61')"
+        )
+
+
+def downgrade():
+    op.execute("DROP TABLE IF EXISTS job_search")
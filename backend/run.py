@@ -1,6 +1,12 @@
+import os
 from app import create_app, db
+from app.analysis.tasks import WorkerPool
 
 flask_app = create_app()
 
 if __name__ == '__main__':
+    # In development the analysis workers run inside the server process. With the
+    # reloader on, only the child process that actually serves requests starts them.
+    if os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
+        WorkerPool(flask_app).start()
     flask_app.run(debug=True, port=5000)
@@ -0,0 +1,17 @@
+import pytest
+from app.ai_engine.job_digest import build_digest
+from app.models import Job
+
+
+@pytest.mark.parametrize('description, must_have, nice_to_have', [
+    # One paragraph: only the sentence with the marker and the ones after it are nice-to-have
+    ('We need Python and Kubernetes. Nice to have: Go.', ['python', 'kubernetes'], ['go']),
+    ('Docker is a plus; Python is required.', ['python'], ['docker']),
+    ('We need Python.\nNice to have:\nGo\nRust', ['python'], ['go', 'rust']),
+    ('Experience with Node.js and React. Bonus: AWS.', ['node.js', 'react'], ['aws']),
+])
+def test_build_digest_splits_skills_at_the_marker_sentence(description, must_have, nice_to_have):
+    digest = build_digest(Job(title='Engineer', description=description))
+
+    assert digest['must_have'] == must_have
+    assert digest['nice_to_have'] == nice_to_have
@@ -0,0 +1,70 @@
+"""
+Listing endpoints must run the same number of SQL statements however many rows
+they return: a per-row query (N+1) makes the count grow with the page.
+"""
+import pytest
+from sqlalchemy import event
+from flask_jwt_extended import create_access_token
+from app import db
+from app.models import User, Job, Application
+
+
+def seed(rows):
+    """A recruiter with `rows` jobs, one job with `rows` applicants, and a student applied to every job."""
+    db.drop_all()
+    db.create_all()
+    recruiter = User(email='recruiter@example.com', role='recruiter', full_name='Recruiter')
+    student = User(email='student@example.com', role='student', full_name='Student')
+    db.session.add_all([recruiter, student])
+    db.session.flush()
+    jobs = [Job(title=f'Job {i}', description='Python developer', recruiter_id=recruiter.id) for i in range(rows)]
+    db.session.add_all(jobs)
+    db.session.flush()
+    for i, job in enumerate(jobs):
+        db.session.add(Application(job_id=job.id, student_id=student.id, resume_path='resume.pdf', score=i))
+    applicants = [User(email=f'applicant{i}@example.com', role='student', full_name=f'Applicant {i}')
+                  for i in range(rows)]
+    db.session.add_all(applicants)
+    db.session.flush()
+    for i, applicant in enumerate(applicants):
+        db.session.add(Application(job_id=jobs[0].id, student_id=applicant.id, resume_path='resume.pdf', score=i))
+    db.session.commit()
+    return {
+        'recruiter': create_access_token(identity=str(recruiter.id), additional_claims={'role': 'recruiter'}),
+        'student': create_access_token(identity=str(student.id), additional_claims={'role': 'student'}),
+        'job_id': jobs[0].id,
+    }
+
+
+def count_statements(client, url, token):
+    """Runs a GET and returns (SQL statements executed, rows returned)."""
+    statements = []
+
+    def record(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    # Start from an empty session, as a real request would
+    db.session.remove()
+    event.listen(db.engine, 'before_cursor_execute', record)
+    try:
+        response = client.get(url, headers={'Authorization': f'Bearer {token}'})
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', record)
+    assert response.status_code == 200, response.get_data(as_text=True)
+    return len(statements), len(response.get_json())
+
+
+# The first job's applicants are the seeded applicants plus the student
+@pytest.mark.parametrize('url, role, extra', [
+    ('/api/jobs/?limit=100', 'recruiter', 0),
+    ('/api/applications/my-applications?limit=100', 'student', 0),
+    ('/api/jobs/{job_id}/applications?limit=100', 'recruiter', 1),
+])
+def test_listing_statement_count_is_constant(app, client, url, role, extra):
+    counts = {}
+    for rows in (1, 20):
+        data = seed(rows)
+        statements, returned = count_statements(client, url.format(job_id=data['job_id']), data[role])
+        assert returned == rows + extra
+        counts[rows] = statements
+    assert counts[1] == counts[20], f'{counts[1]} statements for 1 row, {counts[20]} for 20'
@@ -0,0 +1,32 @@
+import argparse
+import signal
+import time
+from app import create_app
+from app.analysis.tasks import WorkerPool
+
+# Standalone analysis worker. Run as many of these as needed next to the web
+# server; tasks are leased through the database so they never run twice.
+def main():
+    parser = argparse.ArgumentParser(description='Run background resume analysis workers.')
+    parser.add_argument('--threads', type=int, default=None, help='Worker threads in this process (default: ANALYSIS_WORKERS)')
+    args = parser.parse_args()
+
+    app = create_app()
+    pool = WorkerPool(app, size=args.threads).start()
+    print(f"Started {pool.size} analysis worker thread(s). Press Ctrl+C to stop.")
+
+    stopping = []
+    def handle_signal(signum, frame):
+        stopping.append(signum)
+    signal.signal(signal.SIGINT, handle_signal)
+    signal.signal(signal.SIGTERM, handle_signal)
+
+    while not stopping:
+        time.sleep(1)
+
+    print("Stopping workers...")
+    pool.stop()
+
+# The guard matters: text extraction runs in spawned processes, which re-import this module
+if __name__ == '__main__':
+    main()
@@ -17,6 +17,19 @@ api.interceptors.request.use((config) => {
 
 export default api;
 
+// Listing endpoints are paginated: each page carries the cursor of the next one in
+// X-Next-Cursor. Follows the cursors and returns every row, in the largest pages allowed.
+const getAllPages = async (url: string) => {
+    const rows: any[] = [];
+    let cursor: string | undefined;
+    do {
+        const response = await api.get(url, { params: { limit: 200, cursor } });
+        rows.push(...response.data);
+        cursor = response.headers['x-next-cursor'];
+    } while (cursor);
+    return rows;
+};
+
 export const login = async (credentials: any) => {
     const response = await api.post('/auth/login', credentials);
     return response.data;
@@ -33,8 +46,7 @@ export const createJob = async (jobData: any) => {
 };
 
 export const getJobs = async () => {
-    const response = await api.get('/jobs/');
-    return response.data;
+    return getAllPages('/jobs/');
 };
 
 export const getJob = async (id: string) => {
@@ -56,8 +68,7 @@ export const applyJob = async (jobId: string, file: File) => {
 };
 
 export const getMyApplications = async () => {
-    const response = await api.get('/applications/my-applications');
-    return response.data;
+    return getAllPages('/applications/my-applications');
 };
 
 export const sendOtp = async (email: string) => {
@@ -76,8 +87,7 @@ export const resetPassword = async (password: string) => {
 };
 
 export const getJobApplications = async (jobId: number) => {
-    const response = await api.get(`/jobs/${jobId}/applications`);
-    return response.data;
+    return getAllPages(`/jobs/${jobId}/applications`);
 };
 
 export const getProfile = async () => {